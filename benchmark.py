@@ -0,0 +1,221 @@
+"""
+성능 벤치마크 스크립트
+합성 와인 카탈로그로 주요 처리 단계의 속도를 측정합니다.
+
+사용법:
+    python benchmark.py prepare_features --rows 1000000
+    python benchmark.py search_backends --rows 1000000
+    python benchmark.py ann_recall --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from sklearn.neighbors import NearestNeighbors
+
+from data_loader import compact_catalog_dtypes, prepare_features, preprocess_taste_profile
+from search_backends import BACKENDS, make_backend, recall_at_k, select_backend
+
+
+def make_synthetic_catalog(n_rows, seed=0):
+    """
+    cleansingWine.csv와 같은 형식의 합성 원본 데이터프레임을 생성합니다.
+    결측치, 빈 문자열, 숫자가 아닌 가격 등 전처리에서 걸러지는 값도 일부 포함합니다.
+
+    Args:
+        n_rows: 생성할 행 개수
+        seed: 난수 시드
+
+    Returns:
+        pd.DataFrame: 원본 형식의 데이터프레임
+    """
+    rng = np.random.default_rng(seed)
+
+    def taste_column(prefix, high):
+        values = np.array([f"{prefix}{i}" for i in range(1, high + 1)] + ['', None], dtype=object)
+        weights = np.array([1.0] * high + [0.01, 0.01])
+        return values[rng.choice(len(values), size=n_rows, p=weights / weights.sum())]
+
+    names = np.char.add('Wine ', np.arange(n_rows).astype(str)).astype(object)
+    names[rng.random(n_rows) < 0.001] = ' '
+
+    prices = rng.integers(10000, 500000, size=n_rows).astype(object)
+    prices[rng.random(n_rows) < 0.005] = 'N/A'
+
+    abv_choices = np.array(['12', '13.5', '14~15', '', None], dtype=object)
+    type_choices = np.array(['Red', 'White', 'Rose', 'Sparkling', 'Etc', None], dtype=object)
+    nation_choices = np.array(['France', 'Italy', 'Chile', 'USA', 'Spain', 'Australia', None], dtype=object)
+
+    return pd.DataFrame({
+        'name': names,
+        'sweet': taste_column('SWEET', 5),
+        'acidity': taste_column('ACIDITY', 4),
+        'body': taste_column('BODY', 5),
+        'tannin': taste_column('TANNIN', 5),
+        'price': prices,
+        'abv': abv_choices[rng.integers(0, len(abv_choices), size=n_rows)],
+        'type': type_choices[rng.integers(0, len(type_choices), size=n_rows)],
+        'nation': nation_choices[rng.integers(0, len(nation_choices), size=n_rows)],
+        'year': rng.integers(1990, 2024, size=n_rows),
+    })
+
+
+def _prepare_features_legacy(df):
+    """
+    행 단위 apply와 여러 번의 dropna로 구현된 이전 prepare_features (비교 기준)
+    결과 타입은 현재 구현과 같도록 compact_catalog_dtypes()를 적용합니다.
+    """
+    required_columns = [
+        'name', 'sweet', 'acidity', 'body', 'tannin',
+        'price', 'abv', 'type', 'nation', 'year'
+    ]
+    df_processed = df[required_columns].copy()
+    for column in ['sweet', 'acidity', 'body', 'tannin']:
+        df_processed[column] = df_processed[column].apply(preprocess_taste_profile)
+    df_processed = df_processed.dropna(subset=['sweet', 'acidity', 'body', 'tannin'])
+    df_processed['price'] = pd.to_numeric(df_processed['price'], errors='coerce')
+    df_processed = df_processed.dropna(subset=['price'])
+    df_processed['abv'] = pd.to_numeric(df_processed.get('abv'), errors='coerce')
+    df_processed['year'] = pd.to_numeric(df_processed.get('year'), errors='coerce')
+    df_processed = df_processed.dropna(subset=['name'])
+    df_processed = df_processed[df_processed['name'].astype(str).str.strip() != '']
+    return compact_catalog_dtypes(df_processed.reset_index(drop=True))
+
+
+def _best_time(func, repeat):
+    """
+    func를 repeat번 실행하여 가장 빠른 실행 시간(초)과 마지막 결과를 반환합니다.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_prepare_features(n_rows=1_000_000, repeat=3):
+    """
+    이전 구현과 현재 prepare_features의 실행 시간을 비교하고 결과가 같은지 확인합니다.
+    """
+    df_raw = make_synthetic_catalog(n_rows)
+
+    legacy_time, legacy_result = _best_time(lambda: _prepare_features_legacy(df_raw), repeat)
+    current_time, current_result = _best_time(lambda: prepare_features(df_raw), repeat)
+
+    pd.testing.assert_frame_equal(legacy_result, current_result)
+
+    print(f"prepare_features ({n_rows:,}행, 결과 {len(current_result):,}행)")
+    print(f"  이전 구현: {legacy_time:.3f}초")
+    print(f"  현재 구현: {current_time:.3f}초")
+    print(f"  속도 향상: {legacy_time / current_time:.1f}배")
+
+
+def bench_search_backends(n_rows=1_000_000, repeat=3, batch_sizes=(1, 10, 100), k=5):
+    """
+    카탈로그 크기와 질의 개수별로 검색 백엔드의 질의 시간을 비교합니다.
+    search_backends.BRUTE_MAX_WORK 등 'auto' 정책의 기준값을 정하는 근거로 사용합니다.
+    """
+    rng = np.random.default_rng(0)
+    sizes = [size for size in (100, 1_000, 10_000, 100_000, 1_000_000) if size < n_rows] + [n_rows]
+
+    print(f"검색 백엔드 질의 시간 (k={k}, 단위: ms, '-'는 너무 느려 생략)")
+    print(f"{'wines':>10} {'batch':>6} " + " ".join(f"{name:>10}" for name in BACKENDS)
+          + f" {'sklearn':>10} {'auto':>8}")
+
+    for n_samples in sizes:
+        # 정수 격자 주변에 모인 정규화된 taste profile과 비슷한 분포
+        X = (rng.integers(1, 6, size=(n_samples, 4)) + rng.normal(0, 0.3, size=(n_samples, 4)))
+        X = ((X - X.mean(axis=0)) / X.std(axis=0)).astype(np.float32)
+        backends = {name: make_backend(name, X) for name in BACKENDS}
+        reference = NearestNeighbors(n_neighbors=k).fit(X)
+
+        for batch_size in batch_sizes:
+            Q = rng.normal(size=(batch_size, 4)).astype(np.float32)
+            cells = []
+            for name, backend in backends.items():
+                if name == 'brute' and n_samples * batch_size > 10_000_000:
+                    cells.append(f"{'-':>10}")
+                    continue
+                elapsed, _ = _best_time(lambda: backend.kneighbors(Q, k), repeat)
+                cells.append(f"{elapsed * 1000:>10.3f}")
+            elapsed, _ = _best_time(lambda: reference.kneighbors(Q), repeat)
+            cells.append(f"{elapsed * 1000:>10.3f}")
+
+            print(f"{n_samples:>10,} {batch_size:>6} " + " ".join(cells)
+                  + f" {select_backend(n_samples, batch_size):>8}")
+
+
+def evaluate_ann_recall(X_scaled, queries, k=10, n_lists=None, n_probes=(1, 2, 4, 8, 16, 32)):
+    """
+    근사 검색(ivf) 백엔드의 recall@k와 질의 시간을 정확한 NearestNeighbors 결과와 비교합니다.
+    같은 카탈로그(정규화된 feature 행렬, 예: WineKNNModel.X_scaled)에서 n_probe별로 측정합니다.
+
+    Args:
+        X_scaled: 정규화된 카탈로그 feature 행렬
+        queries: 정규화된 질의 행렬
+        k: 비교할 이웃 개수
+        n_lists: ivf 클러스터 개수 (None이면 sqrt(카탈로그 크기))
+        n_probes: 측정할 n_probe 값들
+
+    Returns:
+        list: n_probe별 {'n_probe', 'recall', 'ms_per_query'} 딕셔너리 리스트
+            (첫 항목은 정확한 검색 기준 {'n_probe': None, 'recall': 1.0, ...})
+    """
+    X_scaled = np.asarray(X_scaled, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+
+    exact = NearestNeighbors(n_neighbors=k, algorithm='brute').fit(X_scaled)
+    exact_time, (exact_distances, _) = _best_time(lambda: exact.kneighbors(queries), 1)
+    results = [{'n_probe': None, 'recall': 1.0, 'ms_per_query': exact_time * 1000 / len(queries)}]
+
+    backend = make_backend('ivf', X_scaled, n_lists=n_lists)
+    for n_probe in n_probes:
+        backend.n_probe = n_probe
+        elapsed, (distances, _) = _best_time(lambda: backend.kneighbors(queries, k), 1)
+        results.append({
+            'n_probe': n_probe,
+            'recall': recall_at_k(distances, exact_distances),
+            'ms_per_query': elapsed * 1000 / len(queries),
+        })
+    return results
+
+
+def bench_ann_recall(n_rows=1_000_000, n_queries=200, k=10, n_features=16):
+    """
+    연속값 feature를 가진 합성 카탈로그에서 ivf 근사 검색의 recall@k와 속도를 측정합니다.
+    feature 수는 taste profile 4개에 추가 feature 컬럼을 더한 경우를 가정합니다.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    queries = rng.normal(size=(n_queries, n_features)).astype(np.float32)
+
+    print(f"ivf 근사 검색 ({n_rows:,}개 카탈로그, feature {n_features}개, 질의 {n_queries}개, recall@{k})")
+    print(f"{'n_probe':>8} {'recall':>8} {'ms/query':>10}")
+    for result in evaluate_ann_recall(X, queries, k=k):
+        label = 'exact' if result['n_probe'] is None else result['n_probe']
+        print(f"{label:>8} {result['recall']:>8.3f} {result['ms_per_query']:>10.3f}")
+
+
+BENCHMARKS = {
+    'ann_recall': bench_ann_recall,
+    'prepare_features': bench_prepare_features,
+    'search_backends': bench_search_backends,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="와인 추천 시스템 벤치마크")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help="실행할 벤치마크")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="합성 카탈로그 행 개수 (search_backends는 최대 카탈로그 크기)")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](n_rows=args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,25 @@
 CSV 파일을 읽고, taste profile 컬럼을 숫자로 변환합니다.
 """
 
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
 import pandas as pd
 import re
 
 
+# 전처리된 카탈로그 스냅샷 형식 버전 (형식이 바뀌면 올려서 기존 스냅샷을 무효화)
+SNAPSHOT_FORMAT_VERSION = 4
+
+# 스냅샷에 저장하는 컬럼 구분
+SNAPSHOT_FEATURE_COLUMNS = ['sweet', 'acidity', 'body', 'tannin']
+SNAPSHOT_NUMERIC_COLUMNS = ['price', 'abv', 'year']
+SNAPSHOT_TEXT_COLUMNS = ['name']
+SNAPSHOT_CATEGORY_COLUMNS = ['type', 'nation']
+
+
 def preprocess_taste_profile(value):
     """
     taste profile 문자열을 숫자로 변환
@@ -28,6 +43,55 @@ def preprocess_taste_profile(value):
     return None
 
 
+def _parse_taste_column(series):
+    """
+    taste profile 컬럼 전체를 숫자 배열로 변환합니다.
+    "SWEET1".."TANNIN5"처럼 고유값이 몇 개 되지 않으므로, 고유값에만
+    preprocess_taste_profile()을 적용하고 코드 배열로 한 번에 매핑합니다.
+    
+    Args:
+        series: taste profile 문자열 컬럼
+    
+    Returns:
+        numpy array: 변환 결과 (결측치가 없으면 int64, 있으면 NaN을 포함한 float64)
+    """
+    codes, uniques = pd.factorize(series)
+    parsed = [preprocess_taste_profile(value) for value in uniques]
+    lookup = np.array([np.nan if value is None else value for value in parsed] + [np.nan], dtype=np.float64)
+    
+    # 결측 코드(-1)는 lookup의 마지막 NaN을 가리킴
+    values = lookup[codes]
+    if not np.isnan(values).any():
+        return values.astype(np.int64)
+    return values
+
+
+def compact_catalog_dtypes(df):
+    """
+    전처리된 카탈로그를 메모리를 적게 쓰는 타입으로 변환합니다.
+    - sweet, acidity, body, tannin: int8
+    - type, nation: category
+    - year: Int16 (결측 허용 정수)
+    price, abv는 추천 결과에 그대로 나가므로 float64로 유지합니다. (float32로 줄이면 14.2가 14.199999809265137이 됨)
+    
+    Args:
+        df: 전처리된 데이터프레임 (taste profile 결측치가 없어야 함)
+    
+    Returns:
+        pd.DataFrame: 타입이 변환된 데이터프레임
+    """
+    return df.astype({
+        'sweet': np.int8,
+        'acidity': np.int8,
+        'body': np.int8,
+        'tannin': np.int8,
+        'type': 'category',
+        'nation': 'category',
+        'price': np.float64,
+        'abv': np.float64,
+    }).assign(year=df['year'].round().astype('Int16'))
+
+
 def load_wine_data(file_path="cleansingWine.csv"):
     """
     CSV 파일을 로드합니다.
@@ -56,6 +120,7 @@ def prepare_features(df):
     
     Returns:
         pd.DataFrame: 전처리된 데이터프레임 (name, sweet, acidity, body, tannin 포함)
+            컬럼 타입은 compact_catalog_dtypes()를 따릅니다.
     """
     # 필요한 컬럼만 선택
     required_columns = [
@@ -68,31 +133,357 @@ def prepare_features(df):
     if missing_columns:
         raise ValueError(f"필수 컬럼이 없습니다: {missing_columns}")
     
-    # 필요한 컬럼만 선택
-    df_processed = df[required_columns].copy()
+    taste_columns = ['sweet', 'acidity', 'body', 'tannin']
     
     # taste profile 컬럼을 숫자로 변환
-    for column in ['sweet', 'acidity', 'body', 'tannin']:
-        df_processed[column] = df_processed[column].apply(preprocess_taste_profile)
+    taste_values = {column: _parse_taste_column(df[column]) for column in taste_columns}
+    
+    # 유효한 행의 위치를 단계별로 좁혀 나감 (데이터프레임 복사는 마지막에 한 번만 수행)
+    # taste profile 결측치가 있는 행 제외
+    valid = np.ones(len(df), dtype=bool)
+    for values in taste_values.values():
+        if values.dtype.kind == 'f':
+            valid &= ~np.isnan(values)
+    positions = np.flatnonzero(valid)
+    
+    # price를 숫자로 변환하고 결측치 제외
+    price = pd.to_numeric(df['price'].iloc[positions], errors='coerce')
+    price_valid = price.notna().to_numpy()
+    positions = positions[price_valid]
+    price = price[price_valid]
+    
+    # abv, year 숫자로 변환 (결측 허용)
+    abv = pd.to_numeric(df['abv'].iloc[positions], errors='coerce')
+    year = pd.to_numeric(df['year'].iloc[positions], errors='coerce')
     
-    # 결측치가 있는 행 제거
-    df_processed = df_processed.dropna(subset=['sweet', 'acidity', 'body', 'tannin'])
+    # name이 비어있거나 빈 문자열인 행 제외
+    name = df['name'].iloc[positions]
+    name_valid = (name.notna() & (name.astype(str).str.strip() != '')).to_numpy()
+    positions = positions[name_valid]
+    
+    # 최종 유효 행만 한 번에 선택
+    df_processed = df[required_columns].iloc[positions].reset_index(drop=True)
+    for column, values in taste_values.items():
+        df_processed[column] = values[positions]
+    df_processed['price'] = price.to_numpy()[name_valid]
+    df_processed['abv'] = abv.to_numpy()[name_valid]
+    df_processed['year'] = year.to_numpy()[name_valid]
+    
+    return compact_catalog_dtypes(df_processed)
 
-    # price를 숫자로 변환
-    df_processed['price'] = pd.to_numeric(df_processed['price'], errors='coerce')
 
-    # price 결측치 제거
-    df_processed = df_processed.dropna(subset=['price'])
+def file_signature(file_path):
+    """
+    파일의 크기와 수정 시각(ns)을 반환합니다.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
 
-    # abv, year 숫자로 변환 (결측 허용)
-    df_processed['abv'] = pd.to_numeric(df_processed.get('abv'), errors='coerce')
-    df_processed['year'] = pd.to_numeric(df_processed.get('year'), errors='coerce')
+
+def _file_sha256(file_path, chunk_size=1 << 20):
+    """
+    파일의 SHA-256 해시를 계산합니다.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_snapshot_info(source_file):
+    """
+    스냅샷 무효화 판단에 사용할 원본 파일 정보(크기, 수정 시각, SHA-256)를 반환합니다.
+    """
+    return dict(file_signature(source_file), sha256=_file_sha256(source_file))
+
+
+def atomic_write(path, write_func):
+    """
+    임시 파일에 쓴 뒤 교체하여, 다른 프로세스가 쓰다 만 파일을 읽지 않도록 합니다.
+    기존 파일을 덮어쓰지 않고 새 파일로 교체하므로, 기존 파일을 메모리 매핑한 프로세스도
+    이전 내용을 계속 안전하게 읽을 수 있습니다.
+    
+    Args:
+        path: 최종 파일 경로
+        write_func: 임시 파일 경로를 받아 내용을 쓰는 함수
+    """
+    # 같은 경로에 동시에 쓰는 다른 프로세스나 스레드와 임시 파일이 겹치지 않도록 고유한 이름 사용
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        write_func(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_snapshot_meta(snapshot_dir):
+    """
+    스냅샷 메타데이터(meta.json)를 읽습니다. 없거나 손상된 경우 None을 반환합니다.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot_meta(snapshot_dir, meta):
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    atomic_write(os.path.join(snapshot_dir, 'meta.json'), write)
+
+
+def save_catalog_snapshot(df, snapshot_dir, source_file, source=None):
+    """
+    전처리된 데이터프레임을 컬럼별 .npy 파일과 meta.json으로 저장합니다.
+    .npy 파일은 np.load(mmap_mode='r')로 메모리 매핑하여 읽을 수 있습니다.
+    
+    Args:
+        df: prepare_features()의 결과 데이터프레임
+        snapshot_dir: 스냅샷 디렉터리 경로
+        source_file: 원본 CSV 파일 경로 (무효화 판단에 사용)
+        source: df를 읽기 전에 source_snapshot_info()로 기록한 원본 파일 정보
+            None이면 지금의 파일 정보를 사용 (df를 읽은 뒤 파일이 바뀌지 않은 경우에만 사용)
+    """
+    if source is None:
+        source = source_snapshot_info(source_file)
+    
+    os.makedirs(snapshot_dir, exist_ok=True)
+    
+    # 이전 스냅샷에서 이미 발급한 와인 id는 CSV가 바뀌어도 다시 발급하지 않음
+    previous = _read_snapshot_meta(snapshot_dir) or {}
+    
+    # meta.json을 먼저 지워 두어, 쓰는 도중에는 스냅샷이 유효하지 않게 함
+    meta_path = os.path.join(snapshot_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    arrays = {
+        'features': df[SNAPSHOT_FEATURE_COLUMNS].to_numpy(),
+    }
+    masked_columns = []
+    for column in SNAPSHOT_NUMERIC_COLUMNS:
+        values = df[column].array
+        # 결측 허용 정수(Int16 등)는 값과 결측 마스크를 따로 저장하여 읽을 때 복사 없이 복원
+        if isinstance(values, pd.arrays.IntegerArray):
+            arrays[column] = values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0)
+            arrays[f"{column}.mask"] = np.asarray(values.isna())
+            masked_columns.append(column)
+        # 그 밖의 확장 타입은 NaN을 포함한 float로 저장하고 읽을 때 타입을 복원
+        elif isinstance(df[column].dtype, pd.api.extensions.ExtensionDtype):
+            arrays[column] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            arrays[column] = df[column].to_numpy()
+    for column in SNAPSHOT_TEXT_COLUMNS:
+        arrays[column] = df[column].astype(str).to_numpy(dtype=str)
     
-    # name이 비어있는 행 제거
-    df_processed = df_processed.dropna(subset=['name'])
+    categories = {}
+    for column in SNAPSHOT_CATEGORY_COLUMNS:
+        categorical = pd.Categorical(df[column])
+        arrays[column] = np.asarray(categorical.codes)
+        categories[column] = [str(value) for value in categorical.categories]
     
-    # 빈 문자열 name 제거
-    df_processed = df_processed[df_processed['name'].astype(str).str.strip() != '']
+    for name, array in arrays.items():
+        def write(path, array=array):
+            with open(path, 'wb') as f:
+                np.save(f, array)
+        atomic_write(os.path.join(snapshot_dir, f"{name}.npy"), write)
     
-    return df_processed.reset_index(drop=True)
+    meta = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'n_rows': len(df),
+        'columns': list(df.columns),
+        'dtypes': {column: str(dtype) for column, dtype in df.dtypes.items()},
+        'categories': categories,
+        'masked_columns': masked_columns,
+        'source': source,
+        'next_id': max(len(df), previous.get('next_id', 0)),
+    }
+    _write_snapshot_meta(snapshot_dir, meta)
+
+
+def snapshot_next_id(snapshot_dir):
+    """
+    스냅샷에 기록된 다음 와인 id를 반환합니다.
+    카탈로그에 추가한 와인의 id를 다시 시작한 뒤에도 재사용하지 않기 위해 사용합니다.
+    
+    Args:
+        snapshot_dir: 스냅샷 디렉터리 경로
+    
+    Returns:
+        int 또는 None: 다음 와인 id, 유효한 스냅샷이 없으면 None
+    """
+    meta = _read_snapshot_meta(snapshot_dir)
+    if meta is None or meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return meta.get('next_id', meta['n_rows'])
+
+
+def record_snapshot_next_id(snapshot_dir, next_id):
+    """
+    발급한 와인 id를 스냅샷 메타데이터에 기록합니다. (기록된 값보다 큰 경우에만 갱신)
+    
+    Args:
+        snapshot_dir: 스냅샷 디렉터리 경로
+        next_id: 다음에 발급할 와인 id
+    """
+    meta = _read_snapshot_meta(snapshot_dir)
+    if meta is None or meta.get('next_id', 0) >= next_id:
+        return
+    meta['next_id'] = next_id
+    _write_snapshot_meta(snapshot_dir, meta)
+
+
+def load_catalog_snapshot(snapshot_dir, mmap=True, include_text=True):
+    """
+    save_catalog_snapshot()으로 저장한 스냅샷을 데이터프레임으로 읽습니다.
+    mmap=True이면 숫자/범주 컬럼은 메모리 매핑된 파일을 복사 없이 참조하는 읽기 전용 컬럼이 되어,
+    같은 스냅샷을 여는 여러 프로세스가 OS 페이지 캐시를 공유합니다.
+    
+    Args:
+        snapshot_dir: 스냅샷 디렉터리 경로
+        mmap: True이면 .npy 파일을 메모리 매핑으로 읽음 (기본값: True)
+        include_text: False이면 텍스트 컬럼(name)을 파이썬 문자열로 만들지 않고 제외함
+            (load_snapshot_text()로 메모리 매핑된 배열을 따로 읽음, 기본값: True)
+    
+    Returns:
+        pd.DataFrame: prepare_features()와 같은 형태의 데이터프레임
+    """
+    meta = _read_snapshot_meta(snapshot_dir)
+    if meta is None or meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"유효한 스냅샷이 아닙니다: {snapshot_dir}")
+    
+    mmap_mode = 'r' if mmap else None
+    
+    def load(name):
+        # np.memmap 하위 클래스 대신 같은 메모리를 보는 ndarray로 넘김
+        array = np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+        return array.view(np.ndarray)
+    
+    features = load('features')
+    columns = {}
+    if include_text:
+        for column in SNAPSHOT_TEXT_COLUMNS:
+            columns[column] = load(column).astype(object)
+    for i, column in enumerate(SNAPSHOT_FEATURE_COLUMNS):
+        columns[column] = features[:, i]
+    for column in SNAPSHOT_NUMERIC_COLUMNS:
+        if column in meta['masked_columns']:
+            columns[column] = pd.arrays.IntegerArray(load(column), load(f"{column}.mask"))
+        else:
+            columns[column] = load(column)
+    for column in SNAPSHOT_CATEGORY_COLUMNS:
+        # 저장할 때 만든 코드이므로 검증(복사) 생략
+        columns[column] = pd.Categorical.from_codes(
+            load(column), categories=meta['categories'][column], validate=False
+        )
+    
+    df = pd.DataFrame(columns, copy=False)[[column for column in meta['columns'] if column in columns]]
+    
+    # 저장 당시와 타입이 다른 컬럼만 변환 (같은 타입은 복사하지 않음)
+    dtypes = {
+        column: dtype for column, dtype in meta['dtypes'].items()
+        if column in columns and str(df[column].dtype) != dtype
+    }
+    return df.astype(dtypes) if dtypes else df
+
+
+def load_snapshot_text(snapshot_dir, column='name', mmap=True):
+    """
+    스냅샷의 텍스트 컬럼을 고정 길이 유니코드 numpy 배열로 읽습니다.
+    load_catalog_snapshot(include_text=False)와 함께 사용하면 텍스트도 복사 없이 공유합니다.
+    
+    Args:
+        snapshot_dir: 스냅샷 디렉터리 경로
+        column: 텍스트 컬럼 이름 (기본값: 'name')
+        mmap: True이면 메모리 매핑으로 읽음 (기본값: True)
+    
+    Returns:
+        numpy array: 문자열 배열 (dtype: '<U...')
+    """
+    if column not in SNAPSHOT_TEXT_COLUMNS:
+        raise ValueError(f"스냅샷 텍스트 컬럼이 아닙니다: {column}")
+    return np.load(os.path.join(snapshot_dir, f"{column}.npy"), mmap_mode='r' if mmap else None)
+
+
+def is_snapshot_fresh(snapshot_dir, source_file):
+    """
+    스냅샷이 원본 CSV 파일과 일치하는지 확인합니다.
+    크기와 수정 시각이 같으면 바로 유효로 판단하고, 다르면 SHA-256 해시를 비교합니다.
+    해시가 같으면(내용 변경 없이 수정 시각만 바뀐 경우) 메타데이터를 갱신합니다.
+    
+    Args:
+        snapshot_dir: 스냅샷 디렉터리 경로
+        source_file: 원본 CSV 파일 경로
+    
+    Returns:
+        bool: 스냅샷 사용 가능 여부
+    """
+    meta = _read_snapshot_meta(snapshot_dir)
+    if meta is None or meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        return False
+    
+    source = meta.get('source', {})
+    signature = file_signature(source_file)
+    if source.get('size') == signature['size'] and source.get('mtime_ns') == signature['mtime_ns']:
+        return True
+    
+    if source.get('sha256') != _file_sha256(source_file):
+        return False
+    
+    meta['source'] = dict(signature, sha256=source['sha256'])
+    try:
+        _write_snapshot_meta(snapshot_dir, meta)
+    except OSError:
+        pass
+    return True
+
+
+def load_prepared_catalog(file_path="cleansingWine.csv", snapshot_dir=None, use_snapshot=True):
+    """
+    전처리된 와인 카탈로그를 로드합니다.
+    원본 CSV와 일치하는 스냅샷이 있으면 스냅샷을 메모리 매핑으로 읽고,
+    없거나 오래된 경우 CSV를 다시 전처리한 뒤 스냅샷을 새로 저장합니다.
+    
+    Args:
+        file_path: CSV 파일 경로
+        snapshot_dir: 스냅샷 디렉터리 경로 (기본값: "<file_path>.snapshot")
+        use_snapshot: False이면 스냅샷을 사용하지 않고 항상 CSV를 전처리
+    
+    Returns:
+        pd.DataFrame: 전처리된 데이터프레임
+    """
+    if not use_snapshot:
+        return prepare_features(load_wine_data(file_path))
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+    
+    if snapshot_dir is None:
+        snapshot_dir = f"{file_path}.snapshot"
+    
+    if is_snapshot_fresh(snapshot_dir, file_path):
+        try:
+            return load_catalog_snapshot(snapshot_dir)
+        except Exception as e:
+            print(f"⚠️  스냅샷 읽기 실패, CSV를 다시 읽습니다: {str(e)}")
+    
+    # 읽기 전에 파일 정보를 기록하고, 읽는 도중에 바뀌었으면 스냅샷을 저장하지 않음
+    # (바뀐 파일 정보로 이전 내용을 저장하면 그 스냅샷을 계속 최신으로 판단하게 됨)
+    source = source_snapshot_info(file_path)
+    df = prepare_features(load_wine_data(file_path))
+    if file_signature(file_path) != {key: source[key] for key in ('size', 'mtime_ns')}:
+        print("⚠️  CSV 파일을 읽는 도중에 바뀌어 스냅샷을 저장하지 않습니다.")
+        return df
+    try:
+        save_catalog_snapshot(df, snapshot_dir, file_path, source=source)
+    except Exception as e:
+        print(f"⚠️  스냅샷 저장 실패: {str(e)}")
+    return df
 
@@ -0,0 +1,186 @@
+"""
+와인 필터 인덱스 모듈
+종류(type), 국가(nation), 가격(price) 조건을 만족하는 와인 인덱스를 빠르게 찾습니다.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import atomic_write
+
+
+class WineFilterIndex:
+    """
+    검색 조건별 와인 인덱스를 미리 분할해 두는 클래스
+    - type, nation: 값별로 정렬된 와인 인덱스 배열(파티션)
+    - price: 가격 순으로 정렬한 인덱스와 가격 배열 (이진 탐색으로 범위 선택)
+    """
+
+    def __init__(self, df=None):
+        """
+        필터 인덱스 생성
+
+        Args:
+            df: prepare_features()로 전처리된 데이터프레임 (None이면 빈 인덱스, load()에서 사용)
+        """
+        if df is None:
+            return
+
+        self.n_samples = len(df)
+        self.partitions = {
+            'type': self._build_partitions(df['type']),
+            'nation': self._build_partitions(df['nation']),
+        }
+
+        prices = df['price'].to_numpy(dtype=np.float64)
+        self.price_order = np.argsort(prices, kind='stable')
+        self.sorted_prices = prices[self.price_order]
+
+    @staticmethod
+    def _build_partitions(column):
+        """
+        컬럼 값(대소문자 무시)별 와인 인덱스 배열을 만듭니다.
+        """
+        categorical = pd.Categorical(column)
+        codes = np.asarray(categorical.codes)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+
+        partitions = {}
+        for code, value in enumerate(categorical.categories):
+            start, end = np.searchsorted(sorted_codes, [code, code + 1])
+            rows = order[start:end]
+            key = str(value).casefold()
+            if key in partitions:
+                rows = np.union1d(partitions[key], rows)
+            partitions[key] = rows
+        return partitions
+
+    def save(self, path):
+        """
+        필터 인덱스를 디렉터리에 저장합니다.
+        컬럼별 파티션은 하나의 행 배열과 시작 위치 배열로 이어 붙여 .npy 파일로 저장합니다.
+
+        Args:
+            path: 저장할 디렉터리 경로
+        """
+        os.makedirs(path, exist_ok=True)
+
+        # index.json을 마지막에 쓰므로, 쓰는 도중에는 불러올 수 없음
+        meta_path = os.path.join(path, 'index.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        arrays = {'price_order': self.price_order, 'sorted_prices': self.sorted_prices}
+        keys = {}
+        for column, partitions in self.partitions.items():
+            keys[column] = list(partitions)
+            rows = [partitions[key] for key in keys[column]]
+            arrays[f"{column}_rows"] = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+            arrays[f"{column}_offsets"] = np.concatenate([[0], np.cumsum([len(r) for r in rows])]).astype(np.intp)
+        # 새 파일로 교체하므로 기존 파일을 메모리 매핑한 프로세스에 영향을 주지 않음
+        for name, array in arrays.items():
+            def write(tmp_path, array=array):
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(array))
+            atomic_write(os.path.join(path, f"{name}.npy"), write)
+
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'n_samples': self.n_samples, 'keys': keys}, f, ensure_ascii=False, indent=2)
+        atomic_write(meta_path, write_meta)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        save()로 저장한 필터 인덱스를 불러옵니다.
+        mmap=True이면 파티션 배열은 메모리 매핑된 파일을 복사 없이 참조합니다.
+
+        Args:
+            path: 저장된 디렉터리 경로
+            mmap: 배열을 메모리 매핑으로 읽을지 여부 (기본값: True)
+
+        Returns:
+            WineFilterIndex: 필터 인덱스
+        """
+        try:
+            with open(os.path.join(path, 'index.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"저장된 필터 인덱스를 찾을 수 없습니다: {path}")
+
+        mmap_mode = 'r' if mmap else None
+
+        def load_array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode).view(np.ndarray)
+
+        index = cls()
+        index.n_samples = meta['n_samples']
+        index.price_order = load_array('price_order')
+        index.sorted_prices = load_array('sorted_prices')
+        index.partitions = {}
+        for column, keys in meta['keys'].items():
+            rows = load_array(f"{column}_rows")
+            offsets = load_array(f"{column}_offsets")
+            index.partitions[column] = {
+                key: rows[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)
+            }
+        return index
+
+    def _partition_rows(self, column, values):
+        """
+        하나 또는 여러 값에 해당하는 와인 인덱스를 반환합니다.
+        """
+        if isinstance(values, str):
+            values = [values]
+
+        partitions = self.partitions[column]
+        empty = np.empty(0, dtype=np.intp)
+        rows = [partitions.get(str(value).casefold(), empty) for value in values]
+        if len(rows) == 1:
+            return rows[0]
+        return np.unique(np.concatenate(rows))
+
+    def _price_rows(self, min_price, max_price):
+        """
+        min_price <= price <= max_price인 와인 인덱스를 정렬하여 반환합니다.
+        """
+        start = 0 if min_price is None else np.searchsorted(self.sorted_prices, min_price, side='left')
+        end = len(self.sorted_prices) if max_price is None else np.searchsorted(self.sorted_prices, max_price, side='right')
+        return np.sort(self.price_order[start:end])
+
+    def candidates(self, wine_type=None, nation=None, min_price=None, max_price=None):
+        """
+        조건을 모두 만족하는 와인 인덱스를 반환합니다.
+
+        Args:
+            wine_type: 와인 종류 또는 종류 리스트 (예: 'Red', ['Red', 'Rose'])
+            nation: 국가 또는 국가 리스트 (예: 'France')
+            min_price: 최저 가격 (포함)
+            max_price: 최고 가격 (포함)
+
+        Returns:
+            numpy array 또는 None: 정렬된 와인 인덱스 배열, 조건이 없으면 None
+        """
+        row_sets = []
+        if wine_type is not None:
+            row_sets.append(self._partition_rows('type', wine_type))
+        if nation is not None:
+            row_sets.append(self._partition_rows('nation', nation))
+        if min_price is not None or max_price is not None:
+            row_sets.append(self._price_rows(min_price, max_price))
+
+        if not row_sets:
+            return None
+
+        # 작은 집합부터 교집합을 구함
+        row_sets.sort(key=len)
+        rows = row_sets[0]
+        for other in row_sets[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
@@ -2,20 +2,200 @@
 GPT API를 사용하여 음식에 맞는 와인 프로파일을 생성하는 모듈
 """
 
+import asyncio
 import json
 import os
-from openai import OpenAI
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from openai import (
+    DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI, Timeout
+)
 import streamlit as st
 
+from latency_guard import LatencyTracker, call_hedged
+from profile_cache import normalize_food_name
+from single_flight import SingleFlight
+
 
 # OpenAI API 키 (하드코딩)
 
-def get_food_profile_from_gpt(food_name):
+# 프로파일 생성에 사용하는 모델
+GPT_MODEL = "gpt-4o-mini"
+
+# OpenAI 클라이언트 연결 설정 기본값 (환경변수 또는 configure_openai_client()로 변경)
+# OPENAI_BASE_URL 환경변수를 지정하면 로컬 stub 서버(openai_stub_server.py) 등 다른 서버로 요청합니다.
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "10"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "30"))
+
+# 프로세스 전체에서 재사용하는 클라이언트 (연결 풀 유지)
+# 비동기 클라이언트의 연결은 이벤트 루프에 묶이므로 이벤트 루프마다 하나씩 생성
+_client_lock = threading.Lock()
+_client_settings = {}
+_sync_client = None
+_async_clients = weakref.WeakKeyDictionary()
+
+# 같은 음식(정규화된 이름 기준)에 대한 동시 GPT 요청을 하나의 API 호출로 합침
+_profile_flights = SingleFlight()
+
+# 개별 API 요청의 응답 시간 기록 (hedged 요청을 보낼 시점 계산에 사용)
+HEDGE_PERCENTILE = 95
+_request_latency = LatencyTracker()
+_hedge_executor = None
+
+# 여러 음식을 한 번에 요청하는 경우(get_food_profiles_from_gpt_bulk)의 설정
+# 요청 하나에 넣는 음식 수는 max_tokens를 음식 하나의 응답(JSON 항목과 설명)에 필요한 토큰 수 추정값으로 나누어 정함
+BULK_MAX_TOKENS = 4000
+BULK_TOKENS_PER_FOOD = 250
+BULK_MAX_ATTEMPTS = 3
+
+
+def configure_openai_client(api_key=None, base_url=None, pool_size=None,
+                            connect_timeout=None, read_timeout=None, max_retries=None):
+    """
+    OpenAI 클라이언트 설정을 변경합니다. 지정하지 않은 값은 이전 설정(또는 기본값)을 유지하며,
+    기존 클라이언트는 버리고 다음 호출 때 새 설정으로 다시 생성합니다.
+
+    Args:
+        api_key: OpenAI API 키 (None이면 st.secrets 또는 OPENAI_API_KEY 환경변수)
+        base_url: API 서버 주소 (예: 로컬 stub 서버 "http://127.0.0.1:8001/v1")
+        pool_size: 유지할 최대 연결 수 (keep-alive 연결 포함)
+        connect_timeout: 연결 타임아웃 (초)
+        read_timeout: 응답 대기 타임아웃 (초)
+        max_retries: openai 클라이언트의 재시도 횟수
+    """
+    global _sync_client
+
+    settings = {
+        'api_key': api_key,
+        'base_url': base_url,
+        'pool_size': pool_size,
+        'connect_timeout': connect_timeout,
+        'read_timeout': read_timeout,
+        'max_retries': max_retries,
+    }
+    with _client_lock:
+        _client_settings.update({key: value for key, value in settings.items() if value is not None})
+        _sync_client = None
+        _async_clients.clear()
+
+
+def _get_api_key():
+    """
+    API 키를 찾습니다. (설정값 → st.secrets → OPENAI_API_KEY 환경변수)
+    """
+    api_key = _client_settings.get('api_key')
+    if api_key:
+        return api_key
+
+    try:
+        api_key = st.secrets["OPENAI_API_KEY"]
+    except:
+        api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key:
+        raise ValueError("OpenAI API Key가 설정되지 않았습니다.")
+    return api_key
+
+
+def _client_options():
+    """
+    OpenAI/AsyncOpenAI 생성자 인자와 HTTP 클라이언트 인자를 만듭니다.
+
+    Returns:
+        tuple: (클라이언트 인자 딕셔너리, HTTP 클라이언트 인자 딕셔너리)
+    """
+    pool_size = _client_settings.get('pool_size', OPENAI_POOL_SIZE)
+    options = {
+        'api_key': _get_api_key(),
+        'base_url': _client_settings.get('base_url'),
+        'timeout': Timeout(
+            _client_settings.get('read_timeout', OPENAI_READ_TIMEOUT),
+            connect=_client_settings.get('connect_timeout', OPENAI_CONNECT_TIMEOUT)
+        ),
+    }
+    if 'max_retries' in _client_settings:
+        options['max_retries'] = _client_settings['max_retries']
+
+    # openai가 사용하는 HTTP 라이브러리의 Limits 클래스로 연결 풀 크기 지정
+    limits = type(DEFAULT_CONNECTION_LIMITS)(
+        max_connections=pool_size, max_keepalive_connections=pool_size
+    )
+    return options, {'limits': limits}
+
+
+def get_openai_client():
+    """
+    프로세스 전체에서 공유하는 OpenAI 클라이언트를 반환합니다. (처음 호출할 때 생성, 스레드 안전)
+    같은 클라이언트를 재사용하므로 keep-alive 연결을 다시 사용하여 요청마다 TLS 연결을 새로 맺지 않습니다.
+
+    Returns:
+        OpenAI: 공유 클라이언트
+
+    Raises:
+        ValueError: API 키가 설정되지 않은 경우
+    """
+    global _sync_client
+
+    client = _sync_client
+    if client is not None:
+        return client
+
+    with _client_lock:
+        if _sync_client is None:
+            options, http_options = _client_options()
+            _sync_client = OpenAI(http_client=DefaultHttpxClient(**http_options), **options)
+        return _sync_client
+
+
+def get_async_openai_client():
+    """
+    현재 이벤트 루프에서 공유하는 AsyncOpenAI 클라이언트를 반환합니다. (처음 호출할 때 생성)
+    이벤트 루프 안에서 호출해야 합니다.
+
+    Returns:
+        AsyncOpenAI: 현재 이벤트 루프의 공유 클라이언트
+
+    Raises:
+        ValueError: API 키가 설정되지 않은 경우
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            options, http_options = _client_options()
+            client = AsyncOpenAI(http_client=DefaultAsyncHttpxClient(**http_options), **options)
+            _async_clients[loop] = client
+        return client
+
+
+def _get_hedge_executor():
+    """
+    hedged 요청을 실행하는 스레드 풀을 반환합니다. (처음 호출할 때 생성)
+    """
+    global _hedge_executor
+
+    with _client_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=_client_settings.get('pool_size', OPENAI_POOL_SIZE), thread_name_prefix="gpt-hedge"
+            )
+        return _hedge_executor
+
+
+def get_food_profile_from_gpt(food_name, hedge=False, timeout=None):
     """
     GPT API를 사용하여 음식에 맞는 와인 프로파일을 생성합니다.
+    여러 스레드에서 같은 음식을 동시에 요청하면 진행 중인 API 호출 하나의 결과(또는 오류)를 함께 받습니다.
     
     Args:
         food_name: 음식 이름
+        hedge: True이면 최근 응답 시간의 95 백분위수 안에 응답이 없을 때 같은 요청을 한 번 더 보내
+            먼저 도착한 응답을 사용 (응답 시간 기록이 충분히 쌓이기 전에는 보내지 않음, 기본값: False)
+        timeout: API 요청 하나의 타임아웃(초), None이면 클라이언트 설정 사용
     
     Returns:
         tuple: (프로파일 리스트, 설명 문자열)
@@ -29,29 +209,367 @@ def get_food_profile_from_gpt(food_name):
     Raises:
         Exception: API 호출 실패 시
     """
+    hedge_delay = _request_latency.percentile(HEDGE_PERCENTILE) if hedge else None
+    if hedge_delay is None:
+        return _profile_flights.do(normalize_food_name(food_name), _request_food_profile, food_name, timeout)
+    return _profile_flights.do(
+        normalize_food_name(food_name), call_hedged,
+        _get_hedge_executor(), _request_food_profile, (food_name, timeout), hedge_delay
+    )
+
+
+async def get_food_profile_from_gpt_async(food_name):
+    """
+    get_food_profile_from_gpt()의 asyncio 버전입니다. (AsyncOpenAI 클라이언트 사용)
+    다른 태스크나 스레드에서 진행 중인 같은 음식의 호출과 결과를 공유합니다.
+    
+    Args:
+        food_name: 음식 이름
+    
+    Returns:
+        tuple: (프로파일 리스트, 설명 문자열)
+    """
+    return await _profile_flights.do_async(normalize_food_name(food_name), _request_food_profile_async, food_name)
+
+
+def get_food_profiles_from_gpt_bulk(food_names, max_tokens=BULK_MAX_TOKENS, max_workers=4,
+                                    max_attempts=BULK_MAX_ATTEMPTS, timeout=None, errors=None):
+    """
+    여러 음식의 프로파일을 요청 하나에 묶어 생성합니다. (야간 메뉴 평가 같은 대량 작업용)
+    긴 프롬프트를 음식마다 반복해서 보내지 않고, 응답은 JSON 배열로 받아 get_food_profile_from_gpt()와
+    같은 규칙으로 범위를 검증합니다. 응답에서 빠진 음식만 모아 다시 요청하며,
+    응답이 max_tokens에서 잘린 경우에는 다음 요청부터 묶는 음식 수를 절반으로 줄입니다.
+    
+    Args:
+        food_names: 음식 이름 리스트 (정규화된 이름이 같은 음식은 한 번만 요청)
+        max_tokens: 요청 하나의 최대 응답 토큰 수, 요청 하나에 넣는 음식 수도 이 값으로 정함
+            (기본값: BULK_MAX_TOKENS)
+        max_workers: 동시에 보낼 최대 요청 수 (기본값: 4)
+        max_attempts: 빠진 음식을 다시 요청하는 것을 포함한 최대 시도 횟수 (기본값: BULK_MAX_ATTEMPTS)
+        timeout: 다시 요청하는 것까지 포함한 전체 제한 시간(초), None이면 클라이언트 설정 사용
+            (지정하면 요청마다 남은 시간을 타임아웃으로 주고 재시도하지 않음)
+        errors: 실패한 요청의 오류를 모을 리스트 (일부 음식만 받은 경우에도 실패 여부를 알 수 있음)
+    
+    Returns:
+        dict: {음식 이름: (프로파일 리스트, 설명 문자열)}, 끝내 받지 못한 음식은 포함하지 않음
+    
+    Raises:
+        ValueError: API 키가 설정되지 않은 경우
+        Exception: 모든 요청이 실패하여 프로파일을 하나도 받지 못한 경우
+    """
+    # 정규화된 이름별로 한 번만 요청하고, 결과는 입력한 이름마다 돌려줌
+    names_by_key = {}
+    for food_name in food_names:
+        names_by_key.setdefault(normalize_food_name(food_name), []).append(food_name)
+    pending = [names[0] for names in names_by_key.values()]
+
+    chunk_size = max(1, max_tokens // BULK_TOKENS_PER_FOOD)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    generated = {}
+    error = None
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            error = error or TimeoutError(f"{timeout}초 안에 응답이 없습니다.")
+            break
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [executor.submit(_request_bulk_chunk, chunk, max_tokens, remaining) for chunk in chunks]
+
+        truncated = False
+        for future in futures:
+            try:
+                profiles, chunk_truncated = future.result()
+            except ValueError:
+                raise
+            except Exception as e:
+                error = e
+                if errors is not None:
+                    errors.append(e)
+                continue
+            generated.update(profiles)
+            truncated = truncated or chunk_truncated
+
+        pending = [food_name for food_name in pending if food_name not in generated]
+        if truncated:
+            chunk_size = max(1, chunk_size // 2)
+
+    if not generated and error is not None:
+        raise error
+
+    return {
+        food_name: generated[names[0]]
+        for names in names_by_key.values() if names[0] in generated
+        for food_name in names
+    }
+
+
+def _request_bulk_chunk(food_names, max_tokens, timeout=None):
+    """
+    음식 여러 개를 요청 하나로 보내고 응답 배열에서 받은 음식의 프로파일을 꺼냅니다.
+    
+    Returns:
+        tuple: ({음식 이름: (프로파일, 설명)}, 응답이 max_tokens에서 잘렸는지 여부)
+    """
+    client = get_openai_client()
+    if timeout is not None:
+        client = client.with_options(timeout=timeout, max_retries=0)
+
     try:
-        api_key = st.secrets["OPENAI_API_KEY"]
-    except:
-        api_key = os.getenv("OPENAI_API_KEY")
+        response = client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=_build_bulk_messages(food_names),
+            temperature=0.3,
+            max_tokens=max_tokens
+        )
+    except Exception as e:
+        raise Exception(f"GPT API 호출 오류: {str(e)}")
 
-    if not api_key:
-        raise ValueError("OpenAI API Key가 설정되지 않았습니다.")
+    choice = response.choices[0]
+    profiles = {}
+    for item in _parse_json_array_items(choice.message.content or ""):
+        try:
+            food_name = food_names[int(item["id"]) - 1]
+            profiles.setdefault(food_name, _profile_from_dict(item))
+        except (KeyError, IndexError, TypeError, ValueError):
+            # 번호가 없거나 값이 숫자가 아닌 항목은 빠진 것으로 보고 다시 요청
+            continue
+    return profiles, choice.finish_reason == "length"
 
-    client = OpenAI(api_key=api_key)
-    #client = OpenAI(api_key=OPENAI_API_KEY)
+
+def _parse_json_array_items(content):
+    """
+    JSON 배열 응답에서 완전한 객체 항목들을 꺼냅니다.
+    응답이 중간에 잘려도 그 앞까지의 완전한 항목은 사용합니다.
     
-    prompt = f"""당신은 와인 페어링 전문가입니다. 주어진 음식에 어울리는 와인의 맛 프로파일을 결정해주세요.
+    Returns:
+        list: 딕셔너리 항목 리스트
+    """
+    content = _strip_code_fence(content)
+    start = content.find("[")
+    if start < 0:
+        return []
 
-음식: {food_name}
+    decoder = json.JSONDecoder()
+    items = []
+    pos = start + 1
+    while True:
+        while pos < len(content) and content[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(content) or content[pos] == "]":
+            break
+        try:
+            item, pos = decoder.raw_decode(content, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(item, dict):
+            items.append(item)
+    return items
 
-⚠️ 중요: 음식의 맛 특성이 아니라, 이 음식에 어울리는 와인의 특성을 반환해야 합니다.
+
+def stream_food_profile_from_gpt(food_name, timeout=None):
+    """
+    GPT 응답을 스트리밍으로 받아, 프로파일은 네 값이 도착하는 즉시 돌려주고 설명은 도착하는 대로 조각으로 돌려줍니다.
+    (동시 요청 합치기와 hedged 요청은 적용되지 않음)
+    
+    Args:
+        food_name: 음식 이름
+        timeout: 요청 타임아웃(초, 연결과 각 조각 사이의 대기 시간), None이면 클라이언트 설정 사용
+    
+    Yields:
+        tuple: 처음에 ('profile', [sweet, acidity, body, tannin]) 한 번,
+            이후 ('description', 설명 텍스트 조각) 여러 번
+    
+    Raises:
+        ValueError: API 키가 설정되지 않은 경우
+        Exception: API 호출 또는 응답 파싱 실패 시 (프로파일을 돌려준 뒤에도 발생할 수 있음)
+    """
+    client = get_openai_client()
+    options = {'timeout': timeout} if timeout is not None else {}
+
+    try:
+        stream = client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=_build_messages(food_name),
+            temperature=0.3,
+            max_tokens=300,
+            stream=True,
+            **options
+        )
+    except Exception as e:
+        raise Exception(f"GPT API 호출 오류: {str(e)}")
+
+    parser = ProfileStreamParser()
+    with stream:
+        while True:
+            try:
+                chunk = next(stream, None)
+            except Exception as e:
+                raise Exception(f"GPT API 호출 오류: {str(e)}")
+            if chunk is None:
+                break
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield from parser.feed(chunk.choices[0].delta.content)
+    yield from parser.finish()
+
+
+class ProfileStreamParser:
+    """
+    스트리밍으로 받는 GPT 응답(JSON)을 조각 단위로 해석하는 클래스
+    sweet, acidity, body, tannin 네 값이 모두 도착하면 바로 프로파일을 만들고(범위 검증 포함),
+    description 문자열은 JSON 이스케이프를 풀어 도착한 만큼씩 돌려줍니다.
+    description이 네 값보다 먼저 오면 프로파일을 돌려줄 때까지 모아 둡니다.
+    """
+
+    # 숫자 뒤에 구분자가 와야 숫자가 끝난 것으로 판단 (예: "3"과 "35"를 구분)
+    _VALUE_PATTERN = re.compile(r'"(sweet|acidity|body|tannin)"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\n]')
+    _DESCRIPTION_PATTERN = re.compile(r'"description"\s*:\s*"')
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.buffer = ""
+        self.values = {}
+        self.profile = None
+        self.description = ""
+        self._description_pos = None
+        self._description_done = False
+        self._emitted = 0
+
+    def feed(self, text):
+        """
+        응답 조각을 추가하고 새로 확정된 이벤트를 반환합니다.
+
+        Args:
+            text: 응답 텍스트 조각
+
+        Returns:
+            list: ('profile', 프로파일) 또는 ('description', 텍스트 조각) 튜플 리스트
+        """
+        self.buffer += text
+        events = []
+
+        if self.profile is None:
+            for match in self._VALUE_PATTERN.finditer(self.buffer):
+                self.values.setdefault(match.group(1), float(match.group(2)))
+            if len(self.values) == 4:
+                self.profile = _profile_from_dict(self.values)[0]
+                events.append(('profile', self.profile))
+
+        self._read_description()
+        if self.profile is not None and len(self.description) > self._emitted:
+            events.append(('description', self.description[self._emitted:]))
+            self._emitted = len(self.description)
+        return events
+
+    def _read_description(self):
+        """
+        버퍼에서 description 문자열을 이스케이프를 풀며 읽습니다. (끝나지 않은 이스케이프는 다음 조각까지 대기)
+        """
+        if self._description_done:
+            return
+        if self._description_pos is None:
+            match = self._DESCRIPTION_PATTERN.search(self.buffer)
+            if match is None:
+                return
+            self._description_pos = match.end()
+
+        buffer = self.buffer
+        pos = self._description_pos
+        parts = []
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self._description_done = True
+                pos += 1
+                break
+            if char != '\\':
+                parts.append(char)
+                pos += 1
+                continue
+            if pos + 1 >= len(buffer):
+                break
+            escape = buffer[pos + 1]
+            if escape == 'u':
+                if pos + 6 > len(buffer):
+                    break
+                code = int(buffer[pos + 2:pos + 6], 16)
+                length = 6
+                if 0xD800 <= code < 0xDC00:
+                    # 서로게이트 쌍(예: 이모지)은 뒤따르는 \uXXXX까지 도착해야 한 글자로 합칠 수 있음
+                    if pos + 8 > len(buffer):
+                        break
+                    if buffer[pos + 6:pos + 8] == '\\u':
+                        if pos + 12 > len(buffer):
+                            break
+                        low = int(buffer[pos + 8:pos + 12], 16)
+                        if 0xDC00 <= low < 0xE000:
+                            code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                            length = 12
+                if 0xD800 <= code < 0xE000:
+                    # 짝이 없는 서로게이트는 UTF-8로 인코딩할 수 없으므로 대체 문자로 바꿈
+                    code = 0xFFFD
+                parts.append(chr(code))
+                pos += length
+            else:
+                parts.append(self._ESCAPES.get(escape, escape))
+                pos += 2
+        self._description_pos = pos
+        self.description += ''.join(parts)
+
+    def finish(self):
+        """
+        응답이 끝났을 때 전체 JSON을 검증하고 남은 이벤트를 반환합니다.
+        네 값 중 빠진 값이 있으면 기본값(3)을 사용합니다. (get_food_profile_from_gpt()와 같은 규칙)
+
+        Returns:
+            list: 남은 ('profile', 프로파일), ('description', 텍스트 조각) 튜플 리스트
+
+        Raises:
+            Exception: 응답이 올바른 JSON이 아닌 경우
+        """
+        try:
+            profile, description = _profile_from_dict(json.loads(_strip_code_fence(self.buffer)))
+        except json.JSONDecodeError as e:
+            raise Exception(f"GPT API 응답 파싱 오류: {str(e)}")
+        except Exception as e:
+            raise Exception(f"GPT API 호출 오류: {str(e)}")
+
+        events = []
+        if self.profile is None:
+            self.profile = profile
+            events.append(('profile', profile))
+        if not self._description_done:
+            self.description = description
+        if len(self.description) > self._emitted:
+            events.append(('description', self.description[self._emitted:]))
+            self._emitted = len(self.description)
+        return events
+
+
+# 단일/여러 음식 요청에 공통으로 사용하는 프롬프트
+_SYSTEM_MESSAGE = "당신은 와인 페어링 전문가입니다. 음식의 특성이 아니라, 그 음식에 어울리는 와인의 특성(단맛, 산도, 바디, 탄닌)을 반환해야 합니다. 요청된 형식의 JSON만 응답합니다."
+
+_PROFILE_RULES = """⚠️ 중요: 음식의 맛 특성이 아니라, 이 음식에 어울리는 와인의 특성을 반환해야 합니다.
 예를 들어, 달콤한 디저트라면 음식의 단맛이 아니라, 그 디저트와 잘 어울리는 와인의 단맛 정도를 평가해야 합니다.
 
 다음 4가지 특성은 모두 "와인의 특성"입니다. 각각 숫자로 평가해주세요:
 - sweet (와인의 단맛): 1-5 범위 (1=매우 드라이한 와인, 5=매우 달콤한 와인)
 - acidity (와인의 산도): 1-4 범위 (1=낮은 산도의 와인, 4=높은 산도의 와인)
 - body (와인의 바디감): 1-5 범위 (1=가벼운 바디의 와인, 5=풀 바디의 와인)
-- tannin (와인의 탄닌감): 1-5 범위 (1=부드러운 탄닌의 와인, 5=강한 탄닌의 와인)
+- tannin (와인의 탄닌감): 1-5 범위 (1=부드러운 탄닌의 와인, 5=강한 탄닌의 와인)"""
+
+
+def _build_messages(food_name):
+    """
+    음식 이름으로 GPT에 보낼 메시지 목록을 만듭니다.
+    """
+    prompt = f"""당신은 와인 페어링 전문가입니다. 주어진 음식에 어울리는 와인의 맛 프로파일을 결정해주세요.
+
+음식: {food_name}
+
+{_PROFILE_RULES}
 
 또한 이 음식의 맛과 특징, 그리고 왜 이 프로파일의 와인을 추천하는지 설명해주세요.
 
@@ -66,50 +584,151 @@ def get_food_profile_from_gpt(food_name):
 
 다른 설명 없이 JSON 형식만 응답해주세요."""
 
+    return [
+        {"role": "system", "content": _SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _build_bulk_messages(food_names):
+    """
+    여러 음식을 한 번에 요청하는 메시지 목록을 만듭니다. (음식마다 1부터 번호를 붙여 응답과 맞춤)
+    """
+    food_list = "\n".join(f"{i}. {food_name}" for i, food_name in enumerate(food_names, 1))
+    prompt = f"""당신은 와인 페어링 전문가입니다. 다음 음식 각각에 어울리는 와인의 맛 프로파일을 결정해주세요.
+
+음식 목록:
+{food_list}
+
+{_PROFILE_RULES}
+
+또한 각 음식의 맛과 특징, 그리고 왜 이 프로파일의 와인을 추천하는지 설명해주세요.
+
+반드시 음식 목록의 모든 음식에 대해 다음 JSON 배열 형식으로만 응답해주세요 (id는 음식 목록의 번호):
+[
+    {{
+        "id": 번호,
+        "sweet": 숫자,
+        "acidity": 숫자,
+        "body": 숫자,
+        "tannin": 숫자,
+        "description": "이 음식의 맛과 특징, 왜 이 프로파일을 추천하는지에 대한 설명 (한국어로)"
+    }}
+]
+
+다른 설명 없이 JSON 배열만 응답해주세요."""
+
+    return [
+        {"role": "system", "content": _SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _strip_code_fence(content):
+    """
+    응답 앞뒤의 JSON 코드 블록 표시(```json ... ```)를 제거합니다.
+    """
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content.strip()
+
+
+def _profile_from_dict(profile_dict):
+    """
+    GPT가 반환한 딕셔너리에서 프로파일 값을 꺼내 범위를 검증합니다.
+
+    Args:
+        profile_dict: sweet, acidity, body, tannin, description 키를 가진 딕셔너리
+
+    Returns:
+        tuple: (프로파일 리스트, 설명 문자열)
+    """
+    # 값 검증 및 반환
+    sweet = int(profile_dict.get("sweet", 3))
+    acidity = int(profile_dict.get("acidity", 3))
+    body = int(profile_dict.get("body", 3))
+    tannin = int(profile_dict.get("tannin", 3))
+    description = profile_dict.get("description", "프로파일 설명을 가져올 수 없습니다.")
+    
+    # 범위 검증
+    sweet = max(1, min(5, sweet))
+    acidity = max(1, min(4, acidity))
+    body = max(1, min(5, body))
+    tannin = max(1, min(5, tannin))
+    
+    profile = [sweet, acidity, body, tannin]
+    return profile, description
+
+
+def _parse_response(response):
+    """
+    chat completions 응답에서 JSON을 추출하여 (프로파일, 설명)으로 변환합니다.
+    """
+    try:
+        # 응답에서 JSON 추출 (코드 블록이 있는 경우 제거)
+        content = _strip_code_fence(response.choices[0].message.content)
+        return _profile_from_dict(json.loads(content))
+    except json.JSONDecodeError as e:
+        raise Exception(f"GPT API 응답 파싱 오류: {str(e)}")
+    except Exception as e:
+        raise Exception(f"GPT API 호출 오류: {str(e)}")
+
+
+def _request_food_profile(food_name, timeout=None):
+    """
+    공유 클라이언트로 GPT API를 호출하여 음식에 맞는 와인 프로파일을 생성합니다.
+    
+    Args:
+        food_name: 음식 이름
+        timeout: 요청 타임아웃(초), None이면 클라이언트 설정 사용
+            (지정하면 재시도하지 않으므로 요청은 timeout 안에 끝남)
+    
+    Returns:
+        tuple: (프로파일 리스트, 설명 문자열)
+    
+    Raises:
+        ValueError: API 키가 설정되지 않은 경우
+        Exception: API 호출 실패 시
+    """
+    client = get_openai_client()
+    if timeout is not None:
+        # 같은 연결 풀을 사용하는 복사본으로 이 요청에만 타임아웃 적용
+        client = client.with_options(timeout=timeout, max_retries=0)
+
     try:
+        start = time.perf_counter()
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 와인 페어링 전문가입니다. 음식의 특성이 아니라, 그 음식에 어울리는 와인의 특성(단맛, 산도, 바디, 탄닌)을 반환해야 합니다. 요청된 형식의 JSON만 응답합니다."},
-                {"role": "user", "content": prompt}
-            ],
+            model=GPT_MODEL,
+            messages=_build_messages(food_name),
             temperature=0.3,
             max_tokens=300
         )
-        
-        # 응답에서 JSON 추출
-        content = response.choices[0].message.content.strip()
-        
-        # JSON 파싱 시도
-        # JSON 코드 블록이 있는 경우 제거
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        profile_dict = json.loads(content)
-        
-        # 값 검증 및 반환
-        sweet = int(profile_dict.get("sweet", 3))
-        acidity = int(profile_dict.get("acidity", 3))
-        body = int(profile_dict.get("body", 3))
-        tannin = int(profile_dict.get("tannin", 3))
-        description = profile_dict.get("description", "프로파일 설명을 가져올 수 없습니다.")
-        
-        # 범위 검증
-        sweet = max(1, min(5, sweet))
-        acidity = max(1, min(4, acidity))
-        body = max(1, min(5, body))
-        tannin = max(1, min(5, tannin))
-        
-        profile = [sweet, acidity, body, tannin]
-        return profile, description
-        
-    except json.JSONDecodeError as e:
-        raise Exception(f"GPT API 응답 파싱 오류: {str(e)}")
+        _request_latency.record(time.perf_counter() - start)
     except Exception as e:
         raise Exception(f"GPT API 호출 오류: {str(e)}")
+    return _parse_response(response)
+
+
+async def _request_food_profile_async(food_name):
+    """
+    _request_food_profile()의 asyncio 버전입니다. (현재 이벤트 루프의 AsyncOpenAI 클라이언트 사용)
+    """
+    client = get_async_openai_client()
 
+    try:
+        start = time.perf_counter()
+        response = await client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=_build_messages(food_name),
+            temperature=0.3,
+            max_tokens=300
+        )
+        _request_latency.record(time.perf_counter() - start)
+    except Exception as e:
+        raise Exception(f"GPT API 호출 오류: {str(e)}")
+    return _parse_response(response)
@@ -0,0 +1,277 @@
+"""
+로컬 음식 프로파일 예측 모듈
+GPT로 생성해 둔 (음식 이름 → 프로파일) 쌍에서 이름이 비슷한 음식을 찾아,
+GPT를 호출하지 않고 프로파일을 예측합니다. (문자 n-gram TF-IDF + 최근접 이웃)
+
+사용법 (캐시 데이터로 임계값별 적중률/GPT 일치율 확인):
+    python food_profile_predictor.py --cache food_profile_cache.db
+"""
+
+import argparse
+import threading
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from profile_cache import FoodProfileCache, normalize_food_name
+
+
+# 예측을 사용할 최소 유사도 (코사인 유사도, 0~1)
+DEFAULT_THRESHOLD = 0.8
+
+# add()로 추가된 음식이 학습된 음식 수의 이 비율만큼 쌓이면 인덱스를 다시 만듦
+DEFAULT_REFIT_FRACTION = 0.1
+
+
+class FoodProfilePredictor:
+    """
+    음식 이름의 문자 n-gram TF-IDF 벡터로 가장 비슷한 학습 음식을 찾아 그 프로파일을 반환하는 클래스
+    예: "grilled salmon" → "salmon", "김치 찌개" → "김치찌개"
+    이름의 철자만 비교하므로 "연어"와 "salmon"처럼 언어가 다른 이름은 같은 음식으로 찾지 못합니다.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, ngram_range=(2, 4), refit_fraction=DEFAULT_REFIT_FRACTION):
+        """
+        Args:
+            threshold: predict_confident()가 예측을 반환하는 최소 유사도 (기본값: 0.8)
+            ngram_range: 문자 n-gram 길이 범위 (기본값: (2, 4), 한 글자 n-gram은 거의 모든 이름에
+                들어 있어 구분에 도움이 되지 않고 예측만 느려짐)
+            refit_fraction: add()로 추가된 음식이 학습된 음식 수의 이 비율 이상 쌓이면 인덱스를 다시 만듦
+                (기본값: 0.1, 0이면 추가할 때마다 다시 만듦)
+        """
+        self.threshold = threshold
+        self.ngram_range = ngram_range
+        self.refit_fraction = refit_fraction
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._n_pending = 0
+        # (n-gram 분석 함수, n-gram별 열 번호, idf, n-gram별 학습 행렬(CSR, 행: n-gram),
+        #  이름 리스트, 프로파일 배열, 설명 리스트)
+        # 통째로 교체하므로 예측할 때는 잠금 없이 읽음
+        self._index = None
+
+    @classmethod
+    def from_cache(cls, cache, **kwargs):
+        """
+        프로파일 캐시의 항목으로 학습한 예측기를 생성합니다.
+
+        Args:
+            cache: FoodProfileCache
+            **kwargs: 생성자 인자 (threshold, ngram_range, refit_fraction)
+
+        Returns:
+            FoodProfilePredictor: 학습된 예측기
+        """
+        return cls(**kwargs).fit(cache.items())
+
+    def fit(self, entries):
+        """
+        (음식 이름, 프로파일, 설명) 쌍으로 학습합니다. (기존 학습 내용은 버림)
+
+        Args:
+            entries: (음식 이름, [sweet, acidity, body, tannin], 설명) 튜플의 iterable
+
+        Returns:
+            self
+        """
+        with self._lock:
+            self._entries = {
+                normalize_food_name(name): ([int(value) for value in profile], description)
+                for name, profile, description in entries
+            }
+            self._rebuild()
+        return self
+
+    def add(self, food_name, profile, description):
+        """
+        학습 데이터에 음식 하나를 추가(같은 이름이면 교체)합니다.
+        인덱스를 다시 만드는 데는 학습 데이터 전체만큼 시간이 걸리므로, 추가된 음식이 학습된 음식 수의
+        refit_fraction 이상 쌓였을 때만 다시 만듭니다. 그 전까지 추가된 음식은 예측에 사용되지 않습니다.
+        (GPT 프로파일은 캐시에도 저장되므로 같은 음식은 캐시에서 찾음)
+        """
+        with self._lock:
+            self._entries[normalize_food_name(food_name)] = ([int(value) for value in profile], description)
+            self._n_pending += 1
+            n_indexed = len(self._index[4]) if self._index is not None else 0
+            if self._n_pending >= max(1, n_indexed * self.refit_fraction):
+                self._rebuild()
+
+    def refit(self):
+        """
+        add()로 추가되었지만 아직 인덱스에 반영되지 않은 음식이 있으면 인덱스를 다시 만듭니다.
+        """
+        with self._lock:
+            if self._n_pending:
+                self._rebuild()
+
+    def _rebuild(self):
+        """
+        학습 데이터로 TF-IDF 인덱스를 다시 만듭니다. 호출 측에서 self._lock을 잡고 있어야 합니다.
+        """
+        self._n_pending = 0
+        if not self._entries:
+            self._index = None
+            return
+
+        names = list(self._entries)
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=self.ngram_range)
+        matrix = vectorizer.fit_transform(names)
+        profiles = np.array([self._entries[name][0] for name in names])
+        descriptions = [self._entries[name][1] for name in names]
+        self._index = (
+            vectorizer.build_analyzer(), vectorizer.vocabulary_, vectorizer.idf_, matrix.T.tocsr(),
+            names, profiles, descriptions
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def predict(self, food_name):
+        """
+        가장 비슷한 학습 음식의 프로파일을 반환합니다. (유사도와 관계없이)
+
+        Args:
+            food_name: 음식 이름
+
+        Returns:
+            tuple 또는 None: (프로파일 리스트, 가장 비슷한 음식 이름, 유사도, 그 음식의 설명),
+                학습 데이터가 없으면 None
+        """
+        index = self._index
+        if index is None:
+            return None
+
+        analyzer, vocabulary, idf, ngram_rows, names, profiles, descriptions = index
+        similarities = _cosine_similarities(analyzer, vocabulary, idf, ngram_rows, normalize_food_name(food_name))
+        best = int(np.argmax(similarities))
+        return profiles[best].tolist(), names[best], float(similarities[best]), descriptions[best]
+
+    def predict_confident(self, food_name):
+        """
+        유사도가 threshold 이상인 경우에만 예측을 반환합니다.
+
+        Returns:
+            tuple 또는 None: predict()와 같은 형식, 확신할 수 없으면 None
+        """
+        prediction = self.predict(food_name)
+        if prediction is None or prediction[2] < self.threshold:
+            return None
+        return prediction
+
+
+def _cosine_similarities(analyzer, vocabulary, idf, ngram_rows, text):
+    """
+    text의 TF-IDF 벡터와 학습 음식들의 코사인 유사도를 계산합니다.
+    TfidfVectorizer.transform()과 희소 행렬 곱 대신, 질의에 들어 있는 n-gram의 행만 모아 더하므로
+    질의 하나당 수백 마이크로초 이내로 계산합니다.
+
+    Args:
+        analyzer: TfidfVectorizer.build_analyzer()
+        vocabulary: n-gram → 열 번호 딕셔너리
+        idf: n-gram별 idf 배열
+        ngram_rows: 학습 TF-IDF 행렬의 전치 (CSR, 행: n-gram, 열: 학습 음식)
+        text: 정규화된 음식 이름
+
+    Returns:
+        np.ndarray: 학습 음식별 유사도 (shape: (n_foods,))
+    """
+    counts = {}
+    for ngram in analyzer(text):
+        column = vocabulary.get(ngram)
+        if column is not None:
+            counts[column] = counts.get(column, 0) + 1
+
+    n_foods = ngram_rows.shape[1]
+    if not counts:
+        return np.zeros(n_foods)
+
+    # 질의 TF-IDF 벡터 (학습 데이터와 같이 L2 정규화하므로 내적이 코사인 유사도)
+    columns = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+    weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) * idf[columns]
+    weights /= np.linalg.norm(weights)
+
+    # 질의 n-gram 행의 (학습 음식, 값)을 한 번에 모아 음식별로 더함
+    starts = ngram_rows.indptr[columns]
+    lengths = ngram_rows.indptr[columns + 1] - starts
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return np.bincount(
+        ngram_rows.indices[positions],
+        weights=ngram_rows.data[positions] * np.repeat(weights, lengths),
+        minlength=n_foods
+    )
+
+
+def evaluate_predictor(entries, thresholds=(DEFAULT_THRESHOLD,), test_fraction=0.2, seed=0, **kwargs):
+    """
+    항목 일부를 떼어 두고(held-out) 나머지로 학습한 예측기의 적중률과 GPT 프로파일 일치율을 계산합니다.
+
+    Args:
+        entries: (음식 이름, 프로파일, 설명) 튜플 리스트 (예: FoodProfileCache.items())
+        thresholds: 평가할 유사도 임계값들
+        test_fraction: 평가에 사용할 항목 비율 (기본값: 0.2)
+        seed: 항목을 나누는 난수 시드
+        **kwargs: FoodProfilePredictor 생성자 인자 (ngram_range)
+
+    Returns:
+        list: 임계값별 평가 결과 딕셔너리 리스트
+            - threshold: 유사도 임계값
+            - n_test: 평가 항목 수
+            - hit_rate: 예측을 사용한(임계값 이상) 비율 (GPT 호출을 줄인 비율)
+            - agreement: 예측을 사용한 항목 중 4개 값이 모두 GPT와 같은 비율
+            - within_one: 예측을 사용한 항목 중 4개 값이 모두 GPT와 1 이내로 같은 비율
+            - mae: 예측을 사용한 항목의 평균 절대 오차
+    """
+    entries = list(entries)
+    order = np.random.default_rng(seed).permutation(len(entries))
+    n_test = max(1, int(len(entries) * test_fraction))
+    test = [entries[i] for i in order[:n_test]]
+    predictor = FoodProfilePredictor(**kwargs).fit(entries[i] for i in order[n_test:])
+
+    predictions = [predictor.predict(name) for name, _, _ in test]
+    similarities = np.array([prediction[2] if prediction else 0.0 for prediction in predictions])
+    predicted = np.array([prediction[0] if prediction else [0] * 4 for prediction in predictions])
+    actual = np.array([profile for _, profile, _ in test])
+    errors = np.abs(predicted - actual)
+
+    results = []
+    for threshold in thresholds:
+        hits = similarities >= threshold
+        n_hits = int(hits.sum())
+        results.append({
+            'threshold': threshold,
+            'n_test': len(test),
+            'hit_rate': n_hits / len(test),
+            'agreement': float(np.mean(errors[hits].max(axis=1) == 0)) if n_hits else None,
+            'within_one': float(np.mean(errors[hits].max(axis=1) <= 1)) if n_hits else None,
+            'mae': float(errors[hits].mean()) if n_hits else None,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 음식 프로파일 예측기 평가")
+    parser.add_argument('--cache', default="food_profile_cache.db", help="GPT 프로파일 캐시 SQLite 파일 경로")
+    parser.add_argument('--test-fraction', type=float, default=0.2, help="평가에 사용할 항목 비율")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.6, 0.7, 0.8, 0.9], help="평가할 유사도 임계값")
+    args = parser.parse_args()
+
+    cache = FoodProfileCache(args.cache)
+    entries = cache.items()
+    cache.close()
+    if len(entries) < 2:
+        print(f"평가하려면 캐시 항목이 2개 이상 필요합니다. (현재 {len(entries)}개)")
+        return
+
+    results = evaluate_predictor(entries, thresholds=args.thresholds, test_fraction=args.test_fraction)
+    print(f"로컬 예측기 평가 (캐시 {len(entries)}개 중 {results[0]['n_test']}개 평가)")
+    print(f"{'threshold':>10} {'hit_rate':>9} {'agree':>7} {'within1':>8} {'mae':>6}")
+    for result in results:
+        cells = [
+            f"{result[key]:>{width}.3f}" if result[key] is not None else f"{'-':>{width}}"
+            for key, width in (('agreement', 7), ('within_one', 8), ('mae', 6))
+        ]
+        print(f"{result['threshold']:>10.2f} {result['hit_rate']:>9.3f} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+외부 API 호출 지연 관리 모듈
+최근 응답 시간 기록(LatencyTracker), 느린 요청을 한 번 더 보내는 hedged 호출(call_hedged),
+연속 실패 시 잠시 호출을 멈추는 서킷 브레이커(CircuitBreaker)를 제공합니다.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+
+class LatencyTracker:
+    """
+    최근 응답 시간을 기록하고 백분위수를 계산하는 클래스 (스레드 안전)
+    """
+
+    def __init__(self, window=200, min_samples=20):
+        """
+        Args:
+            window: 기록할 최근 응답 시간 개수
+            min_samples: 백분위수를 계산하기 위한 최소 기록 개수
+        """
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """
+        응답 시간(초)을 기록합니다.
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        """
+        최근 응답 시간의 q 백분위수(초)를 반환합니다.
+
+        Args:
+            q: 백분위 (0~100, 예: 95)
+
+        Returns:
+            float 또는 None: 기록이 min_samples개보다 적으면 None
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = list(self._samples)
+        return float(np.percentile(samples, q))
+
+
+def call_hedged(executor, func, args, hedge_delay):
+    """
+    func을 executor에서 실행하고, hedge_delay초 안에 끝나지 않으면 같은 호출을 한 번 더 보내
+    먼저 성공한 결과를 반환합니다. (늦게 끝나는 호출의 결과는 버림)
+
+    Args:
+        executor: 호출을 실행할 concurrent.futures executor
+        func: 실행할 함수
+        args: func 인자 튜플
+        hedge_delay: 두 번째 요청을 보내기 전까지 기다릴 시간 (초)
+
+    Returns:
+        먼저 성공한 호출의 반환값
+
+    Raises:
+        두 호출이 모두 실패하면 마지막으로 실패한 호출의 오류
+    """
+    first = executor.submit(func, *args)
+    done, _ = wait([first], timeout=hedge_delay)
+    if done:
+        return first.result()
+
+    pending = {first, executor.submit(func, *args)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수가 기준을 넘으면 cooldown 동안 호출을 막는 서킷 브레이커 (스레드 안전)
+    cooldown이 지나면 한 번의 시험 호출을 허용하고, 성공하면 다시 닫히며 실패하면 다시 cooldown 동안 막습니다.
+    시험 호출의 결과가 cooldown 안에 기록되지 않으면 (호출 측이 결과를 기록하지 못한 경우) 새 시험 호출을 허용합니다.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, clock=time.monotonic):
+        """
+        Args:
+            failure_threshold: 호출을 막기 시작하는 연속 실패 횟수
+            cooldown: 호출을 막는 시간 (초)
+            clock: 현재 시각(초)을 반환하는 함수
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+
+    @property
+    def state(self):
+        """
+        'closed' (정상), 'open' (호출 차단) 또는 'half_open' (시험 호출 허용)
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._clock() - self._opened_at < self.cooldown:
+                return 'open'
+            return 'half_open'
+
+    def allow(self):
+        """
+        지금 호출해도 되는지 확인합니다. cooldown이 지난 뒤에는 한 호출만 시험 호출로 허용하며,
+        시험 호출이 cooldown보다 오래 결과를 기록하지 않으면 다음 호출을 새 시험 호출로 허용합니다.
+
+        Returns:
+            bool: 호출 허용 여부
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = self._clock()
+            if now - self._opened_at < self.cooldown:
+                return False
+            if self._trial_started_at is not None and now - self._trial_started_at < self.cooldown:
+                return False
+            self._trial_started_at = now
+            return True
+
+    def record_success(self):
+        """
+        호출 성공을 기록합니다. (연속 실패 횟수 초기화, 서킷 닫힘)
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self):
+        """
+        호출 실패를 기록합니다. 연속 실패가 기준 이상이거나 시험 호출이 실패하면 서킷을 엽니다.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold or self._trial_started_at is not None:
+                self._opened_at = self._clock()
+            self._trial_started_at = None
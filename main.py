@@ -3,16 +3,18 @@
 메인 실행 파일
 """
 
-from recommender import WineRecommender
+from recommender import CatalogLoadError, WineRecommender
 
 
-def format_recommendations(recommendations, profile_info):
+def format_recommendations(recommendations, profile_info, description_stream=None):
     """
     추천 결과를 포맷팅하여 출력합니다.
     
     Args:
         recommendations: 추천 와인 딕셔너리 리스트
         profile_info: 프로파일 정보 딕셔너리
+        description_stream: 설명 텍스트 조각 iterator (지정하면 와인 목록을 먼저 출력하고
+            설명은 도착하는 대로 이어서 출력)
     """
     print("\n" + "="*80)
     print("🍷 추천 와인")
@@ -22,12 +24,19 @@ def format_recommendations(recommendations, profile_info):
     profile = profile_info['profile']
     source = profile_info['source']
     description = profile_info.get('description', '')
-    source_text = "GPT API로 생성" if source == 'gpt' else "기본 프로파일 사용"
+    if source == 'gpt':
+        source_text = "GPT API로 생성"
+    elif source == 'cache':
+        source_text = "저장된 GPT 프로파일 사용"
+    elif source == 'local':
+        source_text = "비슷한 음식의 GPT 프로파일 사용"
+    else:
+        source_text = "기본 프로파일 사용"
     print(f"\n📊 음식 프로파일: 단맛={profile[0]}, 산도={profile[1]}, "
           f"바디={profile[2]}, 탄닌={profile[3]} ({source_text})")
     
     # 설명 출력
-    if description:
+    if description and description_stream is None:
         print(f"\n💬 프로파일 설명:")
         print(f"   {description}")
     
@@ -45,6 +54,14 @@ def format_recommendations(recommendations, profile_info):
         print(f"   알코올 도수: {abv_text}")
         print(f"   종류: {type_text} | 국가: {nation_text} | 빈티지: {year_text}")
     
+    # 스트리밍 설명 출력 (도착하는 대로)
+    if description_stream is not None:
+        print(f"\n💬 프로파일 설명:")
+        print("   ", end="", flush=True)
+        for text in description_stream:
+            print(text.replace("\n", "\n   "), end="", flush=True)
+        print()
+    
     print("\n" + "="*80)
 
 
@@ -58,9 +75,10 @@ def main():
     print("\n음식에 맞는 와인을 추천해드립니다!")
     print("💡 GPT API를 사용하여 임의의 음식에 대한 최적의 와인 프로파일을 생성합니다.")
     
+    recommender = None
     try:
-        # 추천 시스템 초기화
-        recommender = WineRecommender()
+        # 추천 시스템 초기화 (데이터 로드와 모델 학습은 백그라운드에서 진행)
+        recommender = WineRecommender(lazy=True)
         
         # 사용 가능한 기본 음식 목록 출력 (참고용)
         available_foods = recommender.get_available_foods()
@@ -85,25 +103,34 @@ def main():
             try:
                 # GPT API로 프로파일 생성 중 표시
                 print(f"\n🔍 '{food}'에 어울리는 와인 프로파일을 생성하는 중...")
+                if not recommender.ready():
+                    print("⏳ 와인 데이터를 준비하는 중입니다. 프로파일 생성과 함께 진행됩니다...")
                 
-                # 와인 추천
-                recommendations, profile_info = recommender.recommend(food)
+                # 와인 추천 (프로파일이 도착하면 바로 검색하고, 설명은 출력하면서 이어서 받음)
+                recommendations, profile_info, _, description_stream = recommender.recommend_page_stream(food)
                 
                 # 결과 출력
                 print(f"\n✅ '{food}'에 어울리는 와인:")
-                format_recommendations(recommendations, profile_info)
+                format_recommendations(recommendations, profile_info, description_stream)
                 
+            except CatalogLoadError:
+                # 백그라운드 로드 실패는 이후 요청도 모두 실패하므로 바깥에서 처리하고 종료
+                raise
             except ValueError as e:
                 print(f"❌ 오류: {str(e)}")
             except Exception as e:
                 print(f"❌ 예상치 못한 오류가 발생했습니다: {str(e)}")
     
-    except FileNotFoundError as e:
+    except CatalogLoadError as e:
         print(f"❌ 오류: {str(e)}")
-        print("CSV 파일이 올바른 위치에 있는지 확인해주세요.")
+        if isinstance(e.__cause__, FileNotFoundError):
+            print("CSV 파일이 올바른 위치에 있는지 확인해주세요.")
     except Exception as e:
         print(f"❌ 오류: {str(e)}")
         print("프로그램을 시작하는 중 문제가 발생했습니다.")
+    finally:
+        if recommender is not None:
+            recommender.close()
 
 
 if __name__ == "__main__":
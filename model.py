@@ -1,11 +1,37 @@
 """
 KNN 모델 모듈
-StandardScaler와 NearestNeighbors를 사용한 와인 추천 모델
+StandardScaler와 최근접 이웃 검색 백엔드(search_backends)를 사용한 와인 추천 모델
 """
 
+import copy
+import itertools
+import json
+import os
+
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
+
+from data_loader import atomic_write
+from search_backends import make_backend, select_backend
+
+
+# 음식 프로파일이 가질 수 있는 정수 값의 범위 [sweet, acidity, body, tannin]
+# (food_profile_generator의 범위 검증과 동일)
+PROFILE_RANGES = ((1, 5), (1, 4), (1, 5), (1, 5))
+
+# 거리가 이 값 이내로 차이 나면 같은 거리로 보고 order_key 순으로 정렬
+# (float32 계산 오차로 수학적으로 같은 거리가 조금씩 달라지는 것을 흡수)
+DISTANCE_TIE_TOLERANCE = 1e-5
+
+# 저장된 모델 형식 버전 (형식이 바뀌면 올려서 이전 파일을 거부)
+MODEL_FORMAT_VERSION = 5
+
+# 증분 갱신 후 실제 데이터의 평균/표준편차가 정규화 파라미터와 이 값(표준편차 단위) 이상
+# 차이 나면 전체 데이터를 다시 정규화
+RESCALE_DRIFT_THRESHOLD = 0.1
+
+# 후보가 전체 와인의 이 비율 이상이면 미리 계산된 그리드 결과에서 후보만 남겨 먼저 시도
+BROAD_CANDIDATE_RATIO = 0.5
 
 
 class WineKNNModel:
@@ -13,21 +39,51 @@ class WineKNNModel:
     와인 추천을 위한 KNN 모델 클래스
     """
     
-    def __init__(self, n_neighbors=5, metric='euclidean'):
+    def __init__(self, n_neighbors=5, metric='euclidean', precompute_grid=False, algorithm='auto',
+                 collapse_duplicates=False, search_options=None):
         """
         모델 초기화
         
         Args:
             n_neighbors: 추천할 이웃 개수 (기본값: 5)
             metric: 거리 계산 방법 (기본값: 'euclidean')
+            precompute_grid: True이면 학습 시 PROFILE_RANGES 안의 모든 정수 프로파일
+                (5 x 4 x 5 x 5 = 500개)에 대한 결과를 미리 계산해 두고,
+                predict에서 KNN 검색 대신 배열 조회로 응답합니다. (기본값: False)
+            algorithm: 검색 백엔드 ('brute', 'kd_tree', 'ball_tree', 'ivf', 'sharded' 또는 'auto')
+                'auto'이면 검색할 때마다 카탈로그 크기와 질의 개수로 정확한 검색 백엔드를 고릅니다.
+                'ivf'는 근사 검색으로, 명시적으로 지정할 때만 사용됩니다.
+                'sharded'는 카탈로그를 여러 샤드로 나누어 워커 프로세스에서 병렬로 검색합니다. (기본값: 'auto')
+            collapse_duplicates: True이면 같은 taste profile을 가진 와인을 하나의 프로파일로 묶어
+                고유 프로파일만 검색 인덱스에 넣고, 프로파일별 와인 목록(posting list)을 펼쳐
+                결과를 만듭니다. 인덱스 크기가 와인 수가 아니라 고유 프로파일 수에 비례합니다. (기본값: False)
+            search_options: algorithm으로 지정한 백엔드의 옵션 딕셔너리
+                (예: ivf는 {'n_lists': 1000, 'n_probe': 16}, sharded는 {'n_shards': 4})
         """
         self.n_neighbors = n_neighbors
         self.metric = metric
+        self.precompute_grid = precompute_grid
+        self.algorithm = algorithm
+        self.collapse_duplicates = collapse_duplicates
+        self.search_options = search_options or {}
         self.scaler = StandardScaler()
-        self.model = NearestNeighbors(n_neighbors=n_neighbors, metric=metric)
+        self.backends = {}
+        self.grid_distances = None
+        self.grid_indices = None
+        self.X_scaled = None
+        self.n_samples = 0
+        self.order_key = None
+        self.order_rank = None
+        self.X_raw = None
+        self.rescale_threshold = RESCALE_DRIFT_THRESHOLD
+        self.version = 0
+        self.profile_X = None
+        self.posting_rows = None
+        self.posting_offsets = None
+        self.metadata = {}
         self.is_fitted = False
     
-    def fit(self, X):
+    def fit(self, X, order_key=None):
         """
         모델 학습
         
@@ -35,17 +91,374 @@ class WineKNNModel:
             X: 학습 데이터 (numpy array 또는 pandas DataFrame)
                 shape: (n_samples, n_features)
                 features: [sweet, acidity, body, tannin]
+            order_key: 거리가 같은 와인의 정렬 기준 값 (예: 가격, 작은 값이 먼저)
+                None이면 와인 인덱스 순서를 사용합니다.
         """
         # numpy array로 변환
         if hasattr(X, 'values'):
             X = X.values
+        X = np.asarray(X, dtype=np.float64)
         
         # StandardScaler로 정규화
-        X_scaled = self.scaler.fit_transform(X)
+        self.X_scaled = self.scaler.fit_transform(X).astype(np.float32)
+        self.order_key = None if order_key is None else np.asarray(order_key, dtype=np.float64)
+        
+        # 증분 갱신 시 정규화 통계를 정확히 다시 계산하기 위한 정규화 전 feature
+        self.X_raw = X
+        
+        self._rebuild_index()
+    
+    def copy(self):
+        """
+        배열은 원본과 공유하고 정규화 파라미터와 검색 백엔드는 따로 가지는 복사본을 만듭니다.
+        add_samples()/remove_samples()는 배열을 제자리에서 바꾸지 않고 새로 만들므로,
+        복사본을 갱신해도 원본을 사용 중인 검색에는 영향이 없습니다.
+        
+        Returns:
+            WineKNNModel: 복사된 모델
+        """
+        model = copy.copy(self)
+        model.scaler = copy.deepcopy(self.scaler)
+        model.search_options = dict(self.search_options)
+        model.metadata = dict(self.metadata)
+        model.backends = {}
+        return model
+    
+    def add_samples(self, X, order_key=None):
+        """
+        학습된 모델에 와인을 추가합니다.
+        새 와인만 현재 정규화 파라미터로 정규화하여 인덱스에 추가하고,
+        정규화 통계가 RESCALE_DRIFT_THRESHOLD 이상 달라지면 전체를 다시 정규화합니다.
+        
+        Args:
+            X: 추가할 와인의 feature (shape: (n_new, n_features))
+            order_key: 추가할 와인의 정렬 기준 값 (fit()에 order_key를 사용한 경우 필수)
+        """
+        if not self.is_fitted:
+            raise ValueError("모델이 학습되지 않았습니다. fit()을 먼저 호출하세요.")
+        if (order_key is None) != (self.order_key is None):
+            raise ValueError("order_key는 fit()과 같은 방식으로 지정해야 합니다.")
+        
+        if hasattr(X, 'values'):
+            X = X.values
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.X_scaled.shape[1])
+        
+        self.X_scaled = np.concatenate([self.X_scaled, self.scaler.transform(X).astype(np.float32)])
+        self.X_raw = np.concatenate([self.X_raw, X])
+        if order_key is not None:
+            self.order_key = np.concatenate([self.order_key, np.asarray(order_key, dtype=np.float64)])
+        
+        self._rebuild_index()
+    
+    def remove_samples(self, rows):
+        """
+        학습된 모델에서 와인을 삭제합니다. 남은 와인의 인덱스는 앞으로 당겨집니다.
+        정규화 통계가 RESCALE_DRIFT_THRESHOLD 이상 달라지면 전체를 다시 정규화합니다.
+        
+        Args:
+            rows: 삭제할 와인 인덱스 배열
+        """
+        if not self.is_fitted:
+            raise ValueError("모델이 학습되지 않았습니다. fit()을 먼저 호출하세요.")
+        
+        keep = np.ones(self.n_samples, dtype=bool)
+        keep[np.asarray(rows, dtype=np.intp)] = False
+        if not keep.any():
+            raise ValueError("모든 와인을 삭제할 수는 없습니다.")
+        
+        self.X_scaled = self.X_scaled[keep]
+        self.X_raw = self.X_raw[keep]
+        if self.order_key is not None:
+            self.order_key = self.order_key[keep]
+        
+        self._rebuild_index()
+    
+    def _feature_stats(self):
+        """
+        현재 데이터의 feature별 평균, 분산, 표준편차를 반환합니다.
+        StandardScaler와 같이 분산이 계산 오차 수준인 상수 feature의 표준편차는 1로 대체합니다.
+        """
+        n_samples = len(self.X_raw)
+        mean = self.X_raw.mean(axis=0)
+        var = np.maximum(self.X_raw.var(axis=0), 0.0)
         
-        # KNN 모델 학습
-        self.model.fit(X_scaled)
+        # 분산의 계산 오차 상한 (sklearn의 상수 feature 판정과 같은 기준)
+        eps = np.finfo(np.float64).eps
+        constant = var <= n_samples * eps * var + np.square(n_samples * mean * eps)
+        var[constant] = 0.0
+        scale = np.sqrt(var)
+        scale[constant | (scale < 10 * eps)] = 1.0
+        return mean, var, scale
+    
+    def scaling_drift(self):
+        """
+        현재 정규화 파라미터와 현재 데이터의 실제 통계 차이를 계산합니다.
+        
+        Returns:
+            float: 평균 차이(정규화 표준편차 단위)와 표준편차 비율의 차이 중 가장 큰 값
+        """
+        mean, _, scale = self._feature_stats()
+        mean_shift = np.abs(mean - self.scaler.mean_) / self.scaler.scale_
+        scale_change = np.abs(scale / self.scaler.scale_ - 1.0)
+        return float(max(mean_shift.max(), scale_change.max()))
+    
+    def _rescale(self):
+        """
+        현재 데이터의 통계로 정규화 파라미터를 바꾸고 전체 데이터를 다시 정규화합니다.
+        """
+        mean, var, scale = self._feature_stats()
+        self.scaler.mean_ = mean
+        self.scaler.var_ = var
+        self.scaler.scale_ = scale
+        self.scaler.n_samples_seen_ = len(self.X_raw)
+        self.X_scaled = ((self.X_raw - mean) / scale).astype(np.float32)
+    
+    def _rebuild_index(self):
+        """
+        정규화된 데이터(X_scaled)와 order_key로 정렬 순위, posting list, 검색 백엔드,
+        그리드 테이블을 다시 만듭니다. 정규화 통계 변화가 크면 먼저 다시 정규화합니다.
+        """
+        self.n_samples = self.X_scaled.shape[0]
+        if self.is_fitted and self.scaling_drift() > self.rescale_threshold:
+            self._rescale()
+        
+        # 거리가 같은 와인의 정렬 순위 (order_key, 와인 인덱스 순)
+        self.order_rank = None
+        if self.order_key is not None:
+            self.order_rank = np.empty(self.n_samples, dtype=np.intp)
+            self.order_rank[np.lexsort((np.arange(self.n_samples), self.order_key))] = np.arange(self.n_samples)
+        
+        # 고유 프로파일 인덱스와 posting list 생성
+        self.profile_X = self.posting_rows = self.posting_offsets = None
+        if self.collapse_duplicates:
+            self._build_postings()
+        
+        # 검색 백엔드 준비
+        self._reset_backends()
         self.is_fitted = True
+        self.version += 1
+        
+        # 이산 프로파일 공간 전체에 대한 결과 테이블 생성
+        if self.precompute_grid:
+            self._build_grid()
+    
+    def _build_postings(self):
+        """
+        정규화된 학습 데이터에서 고유 프로파일을 찾고, 프로파일별 와인 인덱스 목록을
+        (order_rank, 와인 인덱스) 순으로 정렬하여 하나의 배열과 오프셋 배열로 저장합니다.
+        """
+        self.profile_X, inverse = np.unique(self.X_scaled, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        
+        secondary = self.order_rank if self.order_rank is not None else np.arange(self.n_samples)
+        self.posting_rows = np.lexsort((secondary, inverse))
+        counts = np.bincount(inverse, minlength=len(self.profile_X))
+        self.posting_offsets = np.concatenate([[0], np.cumsum(counts)])
+    
+    def _index_data(self):
+        """
+        검색 인덱스에 넣을 데이터 (고유 프로파일 또는 전체 와인)를 반환합니다.
+        """
+        return self.profile_X if self.profile_X is not None else self.X_scaled
+    
+    def _reset_backends(self):
+        """
+        검색 백엔드를 초기화합니다.
+        'auto'인 경우 백엔드는 처음 필요할 때 생성합니다.
+        """
+        self.close()
+        if self.algorithm != 'auto':
+            self._get_backend(self.algorithm)
+    
+    def close(self):
+        """
+        검색 백엔드가 사용하는 워커 프로세스 등의 자원을 해제합니다.
+        이후 검색하면 백엔드를 다시 생성합니다.
+        """
+        for backend in self.backends.values():
+            if hasattr(backend, 'close'):
+                backend.close()
+        self.backends = {}
+    
+    def _get_backend(self, name):
+        """
+        이름에 해당하는 검색 백엔드를 반환합니다. (없으면 생성)
+        """
+        backend = self.backends.get(name)
+        if backend is None:
+            options = self.search_options if name == self.algorithm else {}
+            backend = make_backend(name, self._index_data(), metric=self.metric, **options)
+            self.backends[name] = backend
+        return backend
+    
+    def _search_index(self, X_scaled, k):
+        """
+        선택된 백엔드로 검색 인덱스에서 가장 가까운 k개를 찾습니다.
+        """
+        name = self.algorithm
+        if name == 'auto':
+            name = select_backend(len(self._index_data()), len(X_scaled), metric=self.metric)
+        
+        distances, indices = self._get_backend(name).kneighbors(X_scaled.astype(np.float32), k)
+        return np.asarray(distances, dtype=np.float64), indices
+    
+    def _kneighbors(self, X_scaled, k):
+        """
+        가장 가까운 k개의 와인을 찾습니다.
+        """
+        if self.profile_X is None:
+            return self._search_rows(X_scaled, k)
+        return self._expand_postings(X_scaled, k)
+    
+    @staticmethod
+    def _row_distances(X_rows, Q):
+        """
+        정규화된 와인 행(X_rows)과 입력(Q) 사이의 거리를 계산합니다.
+        검색 경로와 관계없이 같은 와인의 거리가 같은 값이 되도록 모든 순위 결정에 이 계산을 사용합니다.
+        
+        Args:
+            X_rows: 와인 행 (shape: (m, n_features) 또는 (n_queries, m, n_features))
+            Q: 입력 (shape: (n_features,) 또는 (n_queries, n_features))
+        
+        Returns:
+            numpy array: float64 거리 (shape: X_rows.shape[:-1])
+        """
+        diff = X_rows - Q[..., np.newaxis, :]
+        return np.sqrt(np.einsum('...jk,...jk->...j', diff, diff)).astype(np.float64)
+    
+    def _search_rows(self, X_scaled, k):
+        """
+        검색 인덱스(전체 와인)에서 가장 가까운 k개의 와인을 찾습니다.
+        k번째 와인과 거리가 같은(DISTANCE_TIE_TOLERANCE 이내) 와인까지 모두 모은 뒤
+        _search_candidates()와 같이 (거리, order_rank) 순으로 정렬하므로,
+        백엔드의 탐색 순서와 관계없이 조건을 지정한 검색과 결과 순서가 같습니다.
+        """
+        Q = np.asarray(X_scaled, dtype=self.X_scaled.dtype)
+        m = min(self.n_samples, k)
+        while True:
+            _, indices = self._search_index(Q, m)
+            distances = self._row_distances(self.X_scaled[indices], Q)
+            thresholds = np.partition(distances, k - 1, axis=1)[:, k - 1] + DISTANCE_TIE_TOLERANCE
+            if m == self.n_samples or np.all(distances.max(axis=1) > thresholds):
+                break
+            m = min(self.n_samples, m * 2)
+        
+        secondary = self.order_rank if self.order_rank is not None else np.arange(self.n_samples)
+        tie_groups = np.round(distances / DISTANCE_TIE_TOLERANCE)
+        order = np.lexsort((secondary[indices], tie_groups))[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+    
+    def _expand_postings(self, X_scaled, k):
+        """
+        가까운 고유 프로파일부터 posting list를 펼쳐 k개의 와인을 모읍니다.
+        k번째 와인이 속한 프로파일과 거리가 같은 프로파일까지 모두 모은 뒤
+        (거리, order_rank, 와인 인덱스) 순으로 정렬하므로 결과 순서가 항상 같습니다.
+        거리 비교에는 DISTANCE_TIE_TOLERANCE를 적용합니다.
+        """
+        n_profiles = len(self.profile_X)
+        counts = np.diff(self.posting_offsets)
+        n_queries = len(X_scaled)
+        
+        # 각 프로파일에는 와인이 1개 이상 있으므로 k개의 프로파일이면 충분하지만,
+        # 경계에서 거리가 같은 프로파일이 더 있으면 검색 범위를 넓힘
+        m = min(n_profiles, k)
+        while True:
+            profile_distances, profile_indices = self._search_index(X_scaled, m)
+            covered = np.cumsum(counts[profile_indices], axis=1)
+            boundary = np.argmax(covered >= k, axis=1)
+            thresholds = profile_distances[np.arange(n_queries), boundary]
+            thresholds = thresholds + DISTANCE_TIE_TOLERANCE
+            if m == n_profiles or np.all(profile_distances[:, -1] > thresholds):
+                break
+            m = min(n_profiles, m * 2)
+        
+        secondary = self.order_rank if self.order_rank is not None else np.arange(self.n_samples)
+        distances = np.empty((n_queries, k))
+        indices = np.empty((n_queries, k), dtype=np.intp)
+        for i in range(n_queries):
+            selected = profile_distances[i] <= thresholds[i]
+            profiles = profile_indices[i][selected]
+            rows = np.concatenate([
+                self.posting_rows[self.posting_offsets[p]:self.posting_offsets[p + 1]]
+                for p in profiles
+            ])
+            row_distances = np.repeat(profile_distances[i][selected], counts[profiles])
+            tie_groups = np.round(row_distances / DISTANCE_TIE_TOLERANCE)
+            order = np.lexsort((secondary[rows], tie_groups))[:k]
+            distances[i] = row_distances[order]
+            indices[i] = rows[order]
+        
+        return distances, indices
+    
+    def _build_grid(self):
+        """
+        PROFILE_RANGES 안의 모든 정수 프로파일에 대한 이웃을 한 번에 계산하여
+        (sweet, acidity, body, tannin, n_neighbors) 모양의 배열로 저장합니다.
+        (와인이 n_neighbors개보다 적으면 와인 개수만큼만 저장)
+        """
+        axes = [range(low, high + 1) for low, high in PROFILE_RANGES]
+        grid = np.array(list(itertools.product(*axes)), dtype=float)
+        
+        k = min(self.n_neighbors, self.n_samples)
+        distances, indices = self._kneighbors(self.scaler.transform(grid), k)
+        
+        shape = tuple(len(axis) for axis in axes) + (distances.shape[1],)
+        self.grid_distances = distances.reshape(shape)
+        self.grid_indices = indices.reshape(shape)
+    
+    def _grid_lookup(self, X):
+        """
+        입력이 모두 정수 그리드 위의 프로파일이면 미리 계산된 결과를 반환합니다.
+        
+        Args:
+            X: 2D numpy array (n_samples, n_features)
+        
+        Returns:
+            tuple 또는 None: (distances, indices), 그리드 밖의 입력이 있으면 None
+        """
+        if X.ndim != 2 or X.shape[1] != len(PROFILE_RANGES):
+            return None
+        
+        if not np.issubdtype(X.dtype, np.integer):
+            if not np.issubdtype(X.dtype, np.floating) or not np.all(X == np.round(X)):
+                return None
+        
+        lows = np.array([low for low, _ in PROFILE_RANGES])
+        highs = np.array([high for _, high in PROFILE_RANGES])
+        if np.any(X < lows) or np.any(X > highs):
+            return None
+        
+        offsets = tuple((X - lows).astype(np.intp).T)
+        return self.grid_distances[offsets], self.grid_indices[offsets]
+    
+    def _grid_lookup_filtered(self, X, k, candidates):
+        """
+        그리드의 이웃 중 후보에 속하는 와인만 남겨, 모든 입력에 k개 이상 남으면 반환합니다.
+        그리드 결과는 (거리, order_rank) 순이므로 후보만 남긴 순서는 후보 안에서 검색한 순서와 같습니다.
+        
+        Returns:
+            tuple 또는 None: (distances, indices), 그리드를 쓸 수 없거나 후보가 부족하면 None
+        """
+        if self.grid_indices is None or k > self.grid_indices.shape[-1]:
+            return None
+        
+        X_array = np.asarray(X)
+        if X_array.ndim == 1:
+            X_array = X_array.reshape(1, -1)
+        result = self._grid_lookup(X_array)
+        if result is None:
+            return None
+        
+        distances, indices = result
+        is_candidate = np.zeros(self.n_samples, dtype=bool)
+        is_candidate[np.asarray(candidates, dtype=np.intp)] = True
+        keep = is_candidate[indices]
+        if np.any(keep.sum(axis=1) < k):
+            return None
+        
+        # 행마다 후보인 이웃을 원래 순서대로 앞으로 모음
+        order = np.argsort(~keep, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
     
     def transform(self, X):
         """
@@ -68,7 +481,48 @@ class WineKNNModel:
         
         return self.scaler.transform(X)
     
-    def predict(self, X):
+    def _search_candidates(self, X_scaled, k, candidates):
+        """
+        후보 와인 인덱스 안에서만 가장 가까운 이웃을 찾습니다.
+        후보 행에 대해서만 거리를 계산하므로 후보가 적을수록 빠릅니다.
+        조건 없는 검색과 같이 DISTANCE_TIE_TOLERANCE 이내의 거리는 같은 거리로 보고 order_rank 순으로 정렬합니다.
+        
+        Args:
+            X_scaled: 정규화된 입력 (shape: (n_samples, n_features))
+            k: 찾을 이웃 개수
+            candidates: 정렬된 후보 와인 인덱스 배열
+        
+        Returns:
+            tuple: (distances, indices), 후보가 k개보다 적으면 후보 개수만큼 반환
+        """
+        candidates = np.asarray(candidates, dtype=np.intp)
+        k = min(k, len(candidates))
+        if k == 0:
+            empty = np.empty((X_scaled.shape[0], 0))
+            return empty, empty.astype(np.intp)
+        
+        secondary = self.order_rank[candidates] if self.order_rank is not None else candidates
+        X_candidates = self.X_scaled[candidates]
+        Q = np.asarray(X_scaled, dtype=X_candidates.dtype)
+        
+        distances = np.empty((Q.shape[0], k))
+        indices = np.empty((Q.shape[0], k), dtype=np.intp)
+        for i, q in enumerate(Q):
+            row_distances = self._row_distances(X_candidates, q)
+            
+            # k번째 거리와 같은 거리(허용 오차 이내)의 후보까지 모은 뒤 (거리, order_rank) 순으로 정렬
+            selected = np.arange(len(candidates))
+            if k < len(candidates):
+                kth = np.partition(row_distances, k - 1)[k - 1]
+                selected = np.flatnonzero(row_distances <= kth + DISTANCE_TIE_TOLERANCE)
+            tie_groups = np.round(row_distances[selected] / DISTANCE_TIE_TOLERANCE)
+            order = selected[np.lexsort((secondary[selected], tie_groups))[:k]]
+            distances[i] = row_distances[order]
+            indices[i] = candidates[order]
+        
+        return distances, indices
+    
+    def predict(self, X, k=None, candidates=None):
         """
         입력 프로파일과 가장 가까운 와인들을 찾습니다.
         
@@ -76,20 +530,173 @@ class WineKNNModel:
             X: 입력 프로파일 (numpy array 또는 list)
                 shape: (n_samples, n_features) 또는 (n_features,)
                 features: [sweet, acidity, body, tannin]
+            k: 찾을 이웃 개수, None이면 n_neighbors와 학습 데이터 개수 중 작은 값 (최대: 학습 데이터 개수)
+            candidates: 검색 대상으로 제한할 와인 인덱스 배열, None이면 전체 검색
+                후보가 k개보다 적으면 후보 개수만큼만 반환합니다.
         
         Returns:
             tuple: (distances, indices)
-                - distances: 각 이웃까지의 거리 (shape: (n_samples, n_neighbors))
-                - indices: 가장 가까운 와인의 인덱스 (shape: (n_samples, n_neighbors))
+                - distances: 각 이웃까지의 거리 (shape: (n_samples, k))
+                - indices: 가장 가까운 와인의 인덱스 (shape: (n_samples, k))
         """
         if not self.is_fitted:
             raise ValueError("모델이 학습되지 않았습니다. fit()을 먼저 호출하세요.")
         
+        if k is None:
+            k = min(self.n_neighbors, self.n_samples)
+        if not 1 <= k <= self.n_samples:
+            raise ValueError(f"k는 1 이상 {self.n_samples} 이하여야 합니다: {k}")
+        
+        # 후보가 지정된 경우 후보 안에서만 검색 (모든 와인이 후보이면 조건 없는 검색과 같음)
+        if candidates is not None and len(candidates) < self.n_samples:
+            if len(candidates) >= BROAD_CANDIDATE_RATIO * self.n_samples:
+                result = self._grid_lookup_filtered(X, k, candidates)
+                if result is not None:
+                    return result
+            return self._search_candidates(self.transform(X), k, candidates)
+        
+        # 그리드 위의 프로파일이면 미리 계산된 테이블에서 조회
+        if self.grid_indices is not None and k <= self.grid_indices.shape[-1]:
+            X_array = np.asarray(X)
+            if X_array.ndim == 1:
+                X_array = X_array.reshape(1, -1)
+            result = self._grid_lookup(X_array)
+            if result is not None:
+                distances, indices = result
+                return distances[:, :k], indices[:, :k]
+        
         # 입력 데이터 정규화
         X_scaled = self.transform(X)
         
         # KNN으로 가장 가까운 이웃 찾기
-        distances, indices = self.model.kneighbors(X_scaled)
+        distances, indices = self._kneighbors(X_scaled, k)
         
         return distances, indices
 
+    def save(self, path, metadata=None):
+        """
+        학습된 모델을 디렉터리에 저장합니다.
+        정규화 파라미터는 model.json에, 정규화 전후의 학습 데이터와 그리드 테이블은
+        메모리 매핑 가능한 .npy 파일로 저장합니다.
+        
+        Args:
+            path: 저장할 디렉터리 경로
+            metadata: 함께 저장할 JSON 직렬화 가능한 딕셔너리 (예: 학습 데이터 파일 정보)
+        """
+        if not self.is_fitted:
+            raise ValueError("모델이 학습되지 않았습니다. fit()을 먼저 호출하세요.")
+        
+        os.makedirs(path, exist_ok=True)
+        
+        # model.json을 마지막에 쓰므로, 쓰는 도중에는 불러올 수 없음
+        meta_path = os.path.join(path, 'model.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        
+        arrays = {'X_scaled': self.X_scaled, 'X_raw': self.X_raw}
+        if self.order_rank is not None:
+            arrays['order_key'] = self.order_key
+            arrays['order_rank'] = self.order_rank
+        if self.profile_X is not None:
+            arrays['profile_X'] = self.profile_X
+            arrays['posting_rows'] = self.posting_rows
+            arrays['posting_offsets'] = self.posting_offsets
+        if self.grid_indices is not None:
+            arrays['grid_distances'] = self.grid_distances
+            arrays['grid_indices'] = self.grid_indices
+        # 새 파일로 교체하므로 기존 파일을 메모리 매핑한 프로세스에 영향을 주지 않음
+        for name, array in arrays.items():
+            def write(tmp_path, array=array):
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(array))
+            atomic_write(os.path.join(path, f"{name}.npy"), write)
+        
+        meta = {
+            'format_version': MODEL_FORMAT_VERSION,
+            'n_neighbors': self.n_neighbors,
+            'metric': self.metric,
+            'precompute_grid': self.grid_indices is not None,
+            'algorithm': self.algorithm,
+            'search_options': self.search_options,
+            'collapse_duplicates': self.profile_X is not None,
+            'has_order_rank': self.order_rank is not None,
+            'n_samples': self.n_samples,
+            'metadata': metadata or {},
+            'scaler': {
+                'mean': self.scaler.mean_.tolist(),
+                'scale': self.scaler.scale_.tolist(),
+                'var': self.scaler.var_.tolist(),
+                'n_samples_seen': int(self.scaler.n_samples_seen_),
+            },
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        save()로 저장한 모델을 불러옵니다.
+        정규화와 그리드 계산을 다시 하지 않으며, mmap=True이면 배열을 메모리 매핑으로 읽어
+        같은 파일을 여는 여러 프로세스가 OS 페이지 캐시를 공유합니다.
+        
+        Args:
+            path: 저장된 디렉터리 경로
+            mmap: 배열을 메모리 매핑으로 읽을지 여부 (기본값: True)
+        
+        Returns:
+            WineKNNModel: 학습된 상태의 모델
+        """
+        try:
+            with open(os.path.join(path, 'model.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"저장된 모델을 찾을 수 없습니다: {path}")
+        
+        if meta.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(
+                f"지원하지 않는 모델 형식 버전입니다: {meta.get('format_version')} "
+                f"(지원 버전: {MODEL_FORMAT_VERSION})"
+            )
+        
+        mmap_mode = 'r' if mmap else None
+        
+        def load_array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        
+        model = cls(
+            n_neighbors=meta['n_neighbors'],
+            metric=meta['metric'],
+            precompute_grid=meta['precompute_grid'],
+            algorithm=meta['algorithm'],
+            collapse_duplicates=meta['collapse_duplicates'],
+            search_options=meta['search_options']
+        )
+        
+        # 정규화 파라미터 복원
+        scaler_meta = meta['scaler']
+        model.scaler.mean_ = np.array(scaler_meta['mean'])
+        model.scaler.scale_ = np.array(scaler_meta['scale'])
+        model.scaler.var_ = np.array(scaler_meta['var'])
+        model.scaler.n_samples_seen_ = scaler_meta['n_samples_seen']
+        model.scaler.n_features_in_ = len(scaler_meta['mean'])
+        
+        # 정규화된 학습 데이터와 posting list를 읽고 검색 백엔드만 다시 구성
+        model.X_scaled = load_array('X_scaled')
+        model.n_samples = meta['n_samples']
+        if meta['has_order_rank']:
+            model.order_key = load_array('order_key')
+            model.order_rank = load_array('order_rank')
+        model.X_raw = load_array('X_raw')
+        if meta['collapse_duplicates']:
+            model.profile_X = load_array('profile_X')
+            model.posting_rows = load_array('posting_rows')
+            model.posting_offsets = load_array('posting_offsets')
+        model._reset_backends()
+        model.metadata = meta.get('metadata', {})
+        
+        if meta['precompute_grid']:
+            model.grid_distances = load_array('grid_distances')
+            model.grid_indices = load_array('grid_indices')
+        
+        model.is_fitted = True
+        return model
@@ -0,0 +1,244 @@
+"""
+OpenAI chat completions API를 흉내 내는 로컬 stub 서버
+API 키나 외부 네트워크 없이 food_profile_generator의 GPT 호출 경로를 시험할 때 사용합니다.
+음식 이름에서 항상 같은 프로파일을 만들어 응답합니다.
+
+사용법:
+    python openai_stub_server.py --port 8001 --delay 0.2
+    python openai_stub_server.py --port 8001 --delay 0.05 --tail-delay 3 --tail-every 10
+    python openai_stub_server.py --port 8001 --chunk-delay 0.05  (stream=True 요청을 천천히 스트리밍)
+    python openai_stub_server.py --port 8001 --bulk-limit 5  (여러 음식 요청에 최대 5개만 응답)
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python main.py
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_food_profile(food_name):
+    """
+    음식 이름에서 항상 같은 프로파일과 설명을 만듭니다.
+
+    Args:
+        food_name: 음식 이름
+
+    Returns:
+        dict: sweet, acidity, body, tannin, description 키를 가진 딕셔너리
+    """
+    seed = zlib.crc32(food_name.encode('utf-8'))
+    return {
+        'sweet': seed % 5 + 1,
+        'acidity': seed // 5 % 4 + 1,
+        'body': seed // 20 % 5 + 1,
+        'tannin': seed // 100 % 5 + 1,
+        'description': f"{food_name}에 어울리는 와인 프로파일입니다. (stub)",
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # keep-alive 연결 재사용을 위해 HTTP/1.1 사용
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        request_number = self.server.record_request(body)
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f"Unknown path: {self.path}"}})
+            return
+
+        delay = self.server.delay
+        if self.server.tail_every and request_number % self.server.tail_every == 0:
+            delay = self.server.tail_delay
+        if delay:
+            time.sleep(delay)
+
+        prompt = body['messages'][-1]['content']
+        finish_reason = 'stop'
+        if '음식 목록:' in prompt:
+            # 여러 음식 요청: 번호가 붙은 음식마다 항목을 만들어 JSON 배열로 응답
+            food_list = prompt.split('음식 목록:', 1)[1].split('\n\n', 1)[0]
+            items = [
+                dict(id=int(number), **stub_food_profile(food_name.strip()))
+                for number, food_name in re.findall(r'^(\d+)\. (.*)$', food_list, re.MULTILINE)
+            ]
+            if self.server.bulk_limit and len(items) > self.server.bulk_limit:
+                # max_tokens에서 잘린 응답 흉내 (마지막 항목은 중간에서 끊김)
+                content = json.dumps(items[:self.server.bulk_limit + 1], ensure_ascii=False, indent=4)
+                content = content[:content.rfind('"description"')]
+                finish_reason = 'length'
+            else:
+                content = json.dumps(items, ensure_ascii=False, indent=4)
+        else:
+            match = re.search(r'^음식: (.*)$', prompt, re.MULTILINE)
+            food_name = match.group(1).strip() if match else prompt.strip()
+            content = json.dumps(stub_food_profile(food_name), ensure_ascii=False, indent=4)
+
+        if body.get('stream'):
+            self._send_stream(request_number, body, content)
+            return
+
+        self._send_json(200, {
+            'id': f"chatcmpl-stub-{request_number}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': finish_reason,
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        })
+
+    def _send_stream(self, request_number, body, content, chunk_size=8):
+        """
+        응답을 chunk_size 글자씩 server-sent events(chat.completion.chunk)로 보냅니다.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def chunk(delta, finish_reason=None):
+            return {
+                'id': f"chatcmpl-stub-{request_number}",
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model', 'stub'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+
+        events = [chunk({'role': 'assistant', 'content': ''})]
+        events += [chunk({'content': content[i:i + chunk_size]}) for i in range(0, len(content), chunk_size)]
+        events.append(chunk({}, 'stop'))
+        for event in events:
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """
+    백그라운드 스레드에서 실행되는 stub 서버
+    받은 요청 수와 맺어진 연결 수를 기록하여 연결 재사용 여부를 확인할 수 있습니다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, tail_delay=0.0, tail_every=0, chunk_delay=0.0,
+                 bulk_limit=0):
+        """
+        Args:
+            host: 바인딩할 주소
+            port: 포트 (0이면 빈 포트 자동 선택)
+            delay: 응답 전 대기 시간 (초, 느린 API 흉내)
+            tail_delay: tail_every번째 요청마다 delay 대신 사용할 대기 시간 (초, 가끔 느린 응답 흉내)
+            tail_every: tail_delay를 적용할 요청 간격, 0이면 적용 안 함
+            chunk_delay: 스트리밍 응답의 조각 사이 대기 시간 (초)
+            bulk_limit: 여러 음식 요청에 응답할 최대 음식 수 (넘으면 잘린 응답), 0이면 제한 없음
+        """
+        super().__init__((host, port), _StubHandler)
+        self.delay = delay
+        self.tail_delay = tail_delay
+        self.tail_every = tail_every
+        self.chunk_delay = chunk_delay
+        self.bulk_limit = bulk_limit
+        self.request_count = 0
+        self.connection_count = 0
+        self.requests = []
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """OpenAI 클라이언트의 base_url로 지정할 주소"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 먼저 연결을 끊은 경우(스트리밍 중단 등)는 무시
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def record_connection(self):
+        with self._stats_lock:
+            self.connection_count += 1
+
+    def record_request(self, body):
+        """요청을 기록하고 요청 번호(1부터)를 반환합니다."""
+        with self._stats_lock:
+            self.request_count += 1
+            self.requests.append(body)
+            return self.request_count
+
+    def start(self):
+        """백그라운드 스레드에서 서버를 시작합니다."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """서버를 종료합니다."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI chat completions stub 서버")
+    parser.add_argument('--host', default='127.0.0.1', help="바인딩할 주소")
+    parser.add_argument('--port', type=int, default=8001, help="포트")
+    parser.add_argument('--delay', type=float, default=0.0, help="응답 전 대기 시간 (초)")
+    parser.add_argument('--tail-delay', type=float, default=0.0, help="tail-every번째 요청마다 사용할 대기 시간 (초)")
+    parser.add_argument('--tail-every', type=int, default=0, help="tail-delay를 적용할 요청 간격 (0이면 적용 안 함)")
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help="스트리밍 응답의 조각 사이 대기 시간 (초)")
+    parser.add_argument('--bulk-limit', type=int, default=0, help="여러 음식 요청에 응답할 최대 음식 수 (0이면 제한 없음)")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(
+        args.host, args.port, delay=args.delay, tail_delay=args.tail_delay, tail_every=args.tail_every,
+        chunk_delay=args.chunk_delay, bulk_limit=args.bulk_limit
+    )
+    print(f"stub 서버 실행 중: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+음식 프로파일 캐시 모듈
+GPT API로 생성한 음식 프로파일을 SQLite 파일에 저장하여 재사용합니다.
+"""
+
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_food_name(food_name):
+    """
+    캐시 키로 사용할 음식 이름을 정규화합니다.
+    유니코드 NFC 정규화, 앞뒤 공백 제거, 연속 공백 축약, 대소문자 통일을 수행합니다.
+    예: "  Grilled   STEAK " -> "grilled steak"
+
+    Args:
+        food_name: 음식 이름
+
+    Returns:
+        str: 정규화된 음식 이름
+    """
+    normalized = unicodedata.normalize('NFC', str(food_name))
+    normalized = ' '.join(normalized.split())
+    return normalized.casefold()
+
+
+class FoodProfileCache:
+    """
+    SQLite 기반의 음식 프로파일 영구 캐시 클래스
+    항목별 TTL과 최대 항목 수(가장 오래 사용되지 않은 항목부터 삭제)를 지원합니다.
+    """
+
+    def __init__(self, db_path="food_profile_cache.db", ttl_seconds=30 * 24 * 3600, max_entries=10000):
+        """
+        캐시 초기화
+
+        Args:
+            db_path: SQLite 파일 경로 (':memory:' 사용 시 메모리 캐시)
+            ttl_seconds: 항목 유효 기간(초), None이면 만료 없음 (기본값: 30일)
+            max_entries: 최대 저장 항목 수, None이면 제한 없음 (기본값: 10000)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        # 여러 스레드에서 공유하므로 연결 접근은 self._lock으로 직렬화
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS food_profiles (
+                    food_key TEXT PRIMARY KEY,
+                    sweet INTEGER NOT NULL,
+                    acidity INTEGER NOT NULL,
+                    body INTEGER NOT NULL,
+                    tannin INTEGER NOT NULL,
+                    description TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_food_profiles_accessed_at "
+                "ON food_profiles (accessed_at)"
+            )
+
+    def get(self, food_name):
+        """
+        캐시에서 음식 프로파일을 조회합니다.
+
+        Args:
+            food_name: 음식 이름
+
+        Returns:
+            tuple 또는 None: (프로파일 리스트, 설명 문자열), 없거나 만료된 경우 None
+        """
+        key = normalize_food_name(food_name)
+        now = time.time()
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT sweet, acidity, body, tannin, description, created_at "
+                "FROM food_profiles WHERE food_key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            # 만료된 항목 삭제
+            if self.ttl_seconds is not None and now - row[5] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM food_profiles WHERE food_key = ?", (key,))
+                return None
+
+            self._conn.execute(
+                "UPDATE food_profiles SET accessed_at = ? WHERE food_key = ?",
+                (now, key)
+            )
+
+        return [row[0], row[1], row[2], row[3]], row[4]
+
+    def set(self, food_name, profile, description):
+        """
+        음식 프로파일을 캐시에 저장합니다.
+
+        Args:
+            food_name: 음식 이름
+            profile: [sweet, acidity, body, tannin]
+            description: 프로파일 설명
+        """
+        key = normalize_food_name(food_name)
+        now = time.time()
+        sweet, acidity, body, tannin = (int(value) for value in profile)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO food_profiles "
+                "(food_key, sweet, acidity, body, tannin, description, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, sweet, acidity, body, tannin, description, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        """
+        만료된 항목과 최대 항목 수를 넘는 오래된 항목을 삭제합니다.
+        호출 측에서 self._lock을 잡고 있어야 합니다.
+        """
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM food_profiles WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM food_profiles WHERE food_key IN ("
+                "SELECT food_key FROM food_profiles "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def items(self):
+        """
+        만료되지 않은 모든 항목을 반환합니다. (마지막 사용 시각은 갱신하지 않음)
+
+        Returns:
+            list: (정규화된 음식 이름, 프로파일 리스트, 설명 문자열) 튜플 리스트
+        """
+        query = "SELECT food_key, sweet, acidity, body, tannin, description FROM food_profiles"
+        params = ()
+        if self.ttl_seconds is not None:
+            query += " WHERE created_at >= ?"
+            params = (time.time() - self.ttl_seconds,)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(row[0], [row[1], row[2], row[3], row[4]], row[5]) for row in rows]
+
+    def clear(self):
+        """캐시의 모든 항목을 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM food_profiles")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM food_profiles").fetchone()[0]
+
+    def close(self):
+        """데이터베이스 연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
@@ -3,12 +3,47 @@
 음식 프로파일을 기반으로 와인을 추천합니다.
 """
 
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
 from model import WineKNNModel
-from data_loader import load_wine_data, prepare_features
-from food_profile_generator import get_food_profile_from_gpt
+from data_loader import (
+    atomic_write, compact_catalog_dtypes, file_signature, load_catalog_snapshot, load_prepared_catalog,
+    load_snapshot_text, prepare_features, record_snapshot_next_id, snapshot_next_id
+)
+from filter_index import WineFilterIndex
+from food_profile_generator import (
+    get_food_profile_from_gpt, get_food_profiles_from_gpt_bulk, stream_food_profile_from_gpt
+)
+from food_profile_predictor import FoodProfilePredictor
+from latency_guard import CircuitBreaker
+from profile_cache import FoodProfileCache
+import numpy as np
 import pandas as pd
 
 
+# 공유 디렉터리에서 현재 publish된 버전을 가리키는 manifest 파일 이름
+SHARED_MANIFEST = 'current.json'
+
+
+class CatalogLoadError(Exception):
+    """
+    lazy=True로 만든 추천 시스템의 백그라운드 로드나 모델 학습이 실패한 경우 wait()와 추천 요청에서 발생하는 오류
+    원래 오류(예: 데이터 파일이 없는 경우 FileNotFoundError)는 __cause__에 있습니다.
+    (lazy=False이면 생성자가 원래 오류를 그대로 발생시킵니다.)
+    """
+
+
+# gpt_timeout이 지난 뒤에도 늦은 응답을 캐시에 저장하기 위해 기다리는 최대 시간 (gpt_timeout의 배수)
+# 이 시간이 지나면 HTTP 요청도 끝나므로, API가 응답하지 않아도 요청 스레드가 계속 묶여 있지 않습니다.
+GPT_LATE_TIMEOUT_FACTOR = 2
+
+
 # 음식별 프로파일 정의 [sweet, acidity, body, tannin]
 FOOD_PROFILES = {
     'steak': [2, 3, 5, 5],
@@ -18,39 +53,659 @@ FOOD_PROFILES = {
 }
 
 
+class RecommendationCursor:
+    """
+    recommend_page()의 다음 페이지 위치를 나타내는 커서
+    음식 프로파일과 지금까지 찾은 이웃 순위를 보관하므로, 다음 페이지를 요청할 때
+    GPT API를 다시 호출하거나 처음부터 다시 검색하지 않습니다.
+    커서는 변경되지 않으며, 각 페이지 요청은 새 커서를 반환합니다.
+    """
+    
+    def __init__(self, model, profile_info, distances, indices, offset, page_size, filters=None):
+        """
+        Args:
+            model: 순위를 계산한 WineKNNModel (모델이나 모델의 와인 목록이 바뀌면 순위를 다시 계산)
+            profile_info: recommend()와 같은 형식의 프로파일 정보
+            distances: 지금까지 찾은 이웃까지의 거리 (1D numpy array)
+            indices: 지금까지 찾은 이웃의 와인 인덱스 (1D numpy array)
+            offset: 다음 페이지의 시작 위치
+            page_size: 페이지 크기
+            filters: 검색 조건 딕셔너리 (wine_type, nation, min_price, max_price)
+        """
+        self.model = model
+        self.model_version = model.version
+        self.profile_info = profile_info
+        self.distances = distances
+        self.indices = indices
+        self.offset = offset
+        self.page_size = page_size
+        self.filters = filters or {}
+
+
+class CatalogState:
+    """
+    추천에 필요한 카탈로그 상태 (데이터프레임, 모델, 필터 인덱스, 와인별 추천 결과 딕셔너리)
+    만든 뒤에는 변경하지 않으며, 카탈로그가 바뀌면 새 상태를 만들어 통째로 교체합니다.
+    요청은 시작할 때 가져온 상태 하나만 사용하므로 교체 중에도 일관된 결과를 얻고,
+    이전 상태는 그 상태를 사용하는 요청이 모두 끝나면 자동으로 해제됩니다.
+    """
+    
+    def __init__(self, df, model, filter_index, names=None, source=None, build_records=True, next_id=None):
+        """
+        Args:
+            df: 전처리된 카탈로그 데이터프레임
+            model: 학습된 WineKNNModel
+            filter_index: WineFilterIndex
+            names: 데이터프레임 대신 사용할 와인 이름 배열 (attach()의 메모리 매핑 배열)
+            source: 상태를 만든 데이터 파일의 file_signature() (없으면 None)
+            build_records: 와인별 추천 결과 딕셔너리를 미리 만들지 여부
+                (False이면 추천할 때 선택된 와인만 만듦)
+            next_id: add_wines()가 다음에 발급할 와인 id (None이면 가장 큰 id + 1)
+                삭제된 와인의 id를 재사용하지 않도록 상태를 교체할 때 이어받습니다.
+        """
+        self.df = df
+        self.model = model
+        self.filter_index = filter_index
+        self.names = names
+        self.source = source
+        self.next_id = int(df.index.max()) + 1 if len(df) else 0
+        if next_id is not None:
+            self.next_id = max(self.next_id, next_id)
+        self.records = self.build_records() if build_records else None
+    
+    def build_records(self, rows=None):
+        """
+        와인별 추천 결과 딕셔너리(distance 제외)를 컬럼 단위로 한 번에 만듭니다.
+        
+        Args:
+            rows: 만들 와인 인덱스 배열, None이면 전체 와인
+        
+        Returns:
+            numpy array: 와인 인덱스로 fancy indexing 할 수 있는 딕셔너리 object 배열
+        """
+        df = self.df if rows is None else self.df.iloc[rows]
+        if self.names is None:
+            names = df['name'].tolist()
+        else:
+            names = (self.names if rows is None else self.names[rows]).tolist()
+        
+        def optional(column):
+            values = df[column]
+            return values.astype(object).where(values.notna(), None).tolist()
+        
+        columns = {
+            'id': df.index.tolist(),
+            'name': names,
+            'sweet': df['sweet'].astype(int).tolist(),
+            'acidity': df['acidity'].astype(int).tolist(),
+            'body': df['body'].astype(int).tolist(),
+            'tannin': df['tannin'].astype(int).tolist(),
+            'price': df['price'].astype(float).tolist(),
+            'abv': optional('abv'),
+            'type': optional('type'),
+            'nation': optional('nation'),
+            'year': optional('year'),
+        }
+        keys = list(columns)
+        
+        records = np.empty(len(df), dtype=object)
+        records[:] = [dict(zip(keys, values)) for values in zip(*columns.values())]
+        return records
+    
+    def build_recommendations(self, distances, indices):
+        """
+        KNN 검색 결과로 추천 와인 딕셔너리를 만듭니다.
+        미리 만든 와인별 딕셔너리를 fancy indexing으로 선택하고 distance만 추가합니다.
+        (attach()로 연결한 경우에는 선택된 와인의 딕셔너리만 만듭니다.)
+        
+        Args:
+            distances: 거리 배열 (shape: (n_queries, n_neighbors))
+            indices: 와인 인덱스 배열 (shape: (n_queries, n_neighbors))
+        
+        Returns:
+            list: 질의별 추천 와인 딕셔너리 리스트의 리스트
+        """
+        if self.records is not None:
+            selected = self.records[indices]
+        else:
+            selected = self.build_records(indices.ravel()).reshape(indices.shape)
+        
+        return [
+            [dict(record, distance=distance) for record, distance in zip(row_records, row_distances)]
+            for row_records, row_distances in zip(selected, distances.tolist())
+        ]
+
+
 class WineRecommender:
     """
     와인 추천 클래스
+    카탈로그 상태(CatalogState)는 변경하지 않고 새로 만들어 교체하므로, 여러 스레드에서 하나의 인스턴스를
+    공유할 수 있습니다. 추천 요청은 잠금 없이 현재 상태를 읽고, 상태를 바꾸는 작업
+    (reload(), add_wines(), remove_wines())은 서로 직렬화됩니다.
+    
+    lazy=True이면 생성자는 바로 반환하고 카탈로그 로드와 모델 학습을 백그라운드 스레드에서 진행합니다.
+    ready()/wait()로 준비 상태를 확인할 수 있으며, 준비 전에 추천을 요청하면 음식 프로파일(GPT)을
+    먼저 가져온 뒤 준비가 끝날 때까지 기다리므로 GPT 호출과 모델 준비가 동시에 진행됩니다.
+    
+    watch_interval을 지정하면 백그라운드 스레드가 데이터 파일을 감시하다가, 파일이 바뀌면
+    카탈로그와 모델을 새로 만들어 교체합니다. (재시작 없이 반영, 진행 중인 요청은 이전 상태로 완료)
+    
+    여러 워커 프로세스가 같은 호스트에서 실행되는 경우, 로더 프로세스 하나가 publish()로
+    카탈로그/모델/필터 인덱스를 공유 디렉터리에 저장하고, 각 워커는 attach()로
+    메모리 매핑하여 복사 없이 읽기 전용으로 사용할 수 있습니다.
     """
     
-    def __init__(self, data_file="cleansingWine.csv", n_neighbors=5):
+    def __init__(self, data_file="cleansingWine.csv", n_neighbors=5, precompute_grid=True,
+                 profile_cache_path="food_profile_cache.db", use_snapshot=True, model_dir=None,
+                 collapse_duplicates=True, algorithm='auto', search_options=None, n_shards=None,
+                 snapshot_dir=None, watch_interval=None, lazy=False, gpt_timeout=10.0, hedge_gpt=False,
+                 gpt_failure_threshold=5, gpt_cooldown=30.0, local_threshold=None, gpt_max_in_flight=16):
         """
         추천 시스템 초기화
         
         Args:
             data_file: 와인 데이터 CSV 파일 경로
             n_neighbors: 추천할 와인 개수 (기본값: 5)
+            precompute_grid: 정수 프로파일 전체의 추천 결과를 미리 계산할지 여부 (기본값: True)
+            profile_cache_path: GPT 프로파일 캐시 SQLite 파일 경로, None이면 캐시 사용 안 함
+                (기본값: "food_profile_cache.db")
+            use_snapshot: 전처리된 카탈로그 스냅샷을 사용할지 여부 (기본값: True)
+            model_dir: 학습된 모델을 저장/재사용할 디렉터리, None이면 매번 학습 (기본값: None)
+            collapse_duplicates: 같은 taste profile의 와인을 묶어 고유 프로파일만 인덱싱할지 여부
+                거리가 같은 와인은 가격이 낮은 순으로 정렬됩니다. (기본값: True)
+            algorithm: 검색 백엔드 ('auto', 'brute', 'kd_tree', 'ball_tree', 근사 검색 'ivf', 'sharded')
+            search_options: 검색 백엔드 옵션 (예: ivf의 {'n_lists': 1000, 'n_probe': 16})
+            n_shards: 지정하면 검색 인덱스를 n_shards개로 나누어 워커 프로세스에서 병렬 검색
+                (algorithm='sharded'와 같음). 고유 프로파일 수가 적은 경우에는
+                collapse_duplicates=False와 함께 사용해야 효과가 있습니다. (기본값: None)
+            snapshot_dir: 전처리된 카탈로그 스냅샷 디렉터리 (기본값: "<data_file>.snapshot")
+            watch_interval: 데이터 파일 변경을 확인할 간격(초), None이면 감시하지 않음 (기본값: None)
+            lazy: True이면 백그라운드 스레드에서 로드하고 바로 반환 (기본값: False)
+                False이면 로드 실패 시 원래 오류(FileNotFoundError 등)를 그대로 발생시키고,
+                True이면 이후 wait()와 추천 요청에서 CatalogLoadError로 알립니다.
+            gpt_timeout: GPT 프로파일 요청을 기다리는 최대 시간(초), 넘으면 기본 프로파일 사용
+                None이면 제한 없음 (기본값: 10.0)
+            hedge_gpt: 응답이 최근 95 백분위수 응답 시간보다 늦으면 같은 요청을 한 번 더 보낼지 여부 (기본값: False)
+            gpt_failure_threshold: 연속으로 이 횟수만큼 GPT 호출이 실패하면 gpt_cooldown 동안
+                GPT를 호출하지 않고 캐시/기본 프로파일 사용 (기본값: 5)
+            gpt_cooldown: GPT 호출을 멈추는 시간(초) (기본값: 30.0)
+            local_threshold: 지정하면 캐시의 GPT 프로파일로 학습한 로컬 예측기를 사용하여,
+                이름의 유사도가 이 값 이상인 음식은 GPT를 호출하지 않음
+                (0~1, 예: 0.8, food_profile_predictor.py로 임계값별 적중률 확인, 기본값: None)
+            gpt_max_in_flight: gpt_timeout을 적용한 GPT 요청을 동시에 진행할 최대 개수,
+                모두 진행 중이면 기다리지 않고 기본 프로파일 사용 (기본값: 16)
         """
-        # 데이터 로드 및 전처리
-        print("데이터를 로드하는 중...")
-        df_raw = load_wine_data(data_file)
-        self.df = prepare_features(df_raw)
+        if n_shards is not None:
+            algorithm = 'sharded'
+            search_options = dict(search_options or {}, n_shards=n_shards)
         
         # feature 추출
         self.features = ['sweet', 'acidity', 'body', 'tannin']
-        X = self.df[self.features]
         
-        # 모델 생성 및 학습
+        self.data_file = data_file
+        self._load_options = {'snapshot_dir': snapshot_dir, 'use_snapshot': use_snapshot}
+        self._model_dir = model_dir
+        self._model_settings = {
+            'n_neighbors': n_neighbors,
+            'precompute_grid': precompute_grid,
+            'collapse_duplicates': collapse_duplicates,
+            'algorithm': algorithm,
+            'search_options': search_options or {},
+        }
+        self._update_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._watcher = None
+        self._state = None
+        self._ready = threading.Event()
+        self._load_error = None
+        
+        # GPT 프로파일 캐시와 호출 정책 (로드 전에도 음식 프로파일을 가져올 수 있도록 먼저 생성)
+        self.profile_cache = FoodProfileCache(profile_cache_path) if profile_cache_path else None
+        self._init_gpt_policy(
+            gpt_timeout, hedge_gpt, gpt_failure_threshold, gpt_cooldown, local_threshold, gpt_max_in_flight
+        )
+        
+        # 카탈로그 로드, 모델 학습, 인덱스 생성
+        if lazy:
+            threading.Thread(
+                target=self._initial_load, args=(watch_interval,), name="wine-catalog-loader", daemon=True
+            ).start()
+        else:
+            self._initial_load(watch_interval)
+            if self._load_error is not None:
+                raise self._load_error
+    
+    def _init_gpt_policy(self, gpt_timeout=10.0, hedge_gpt=False, gpt_failure_threshold=5, gpt_cooldown=30.0,
+                         local_threshold=None, gpt_max_in_flight=16):
+        """
+        GPT 프로파일 요청의 시간 제한, hedged 요청, 서킷 브레이커, 로컬 예측기를 설정합니다.
+        """
+        self.gpt_timeout = gpt_timeout
+        self.hedge_gpt = hedge_gpt
+        self.gpt_breaker = CircuitBreaker(gpt_failure_threshold, gpt_cooldown)
+        # 요청 스레드 수만큼만 받고, 모두 사용 중이면 큐에서 기다리지 않고 바로 거절
+        self._gpt_executor = ThreadPoolExecutor(max_workers=gpt_max_in_flight, thread_name_prefix="gpt-profile")
+        self._gpt_slots = threading.BoundedSemaphore(gpt_max_in_flight)
+        
+        self.profile_predictor = None
+        if local_threshold is not None and self.profile_cache is not None:
+            try:
+                self.profile_predictor = FoodProfilePredictor.from_cache(self.profile_cache, threshold=local_threshold)
+            except Exception as e:
+                print(f"⚠️  로컬 프로파일 예측기 생성 실패: {str(e)}")
+    
+    def _initial_load(self, watch_interval):
+        """
+        처음 카탈로그 상태를 만들고 준비 완료를 알립니다. (lazy=True이면 백그라운드 스레드에서 실행)
+        실패하면 오류를 보관했다가 wait()에서 다시 발생시킵니다.
+        """
+        try:
+            self._state = self._build_state()
+            if watch_interval is not None:
+                self.start_watching(watch_interval)
+        except Exception as e:
+            self._load_error = e
+        finally:
+            self._ready.set()
+    
+    def ready(self):
+        """
+        카탈로그와 모델이 준비되었는지 확인합니다. (기다리지 않음)
+        
+        Returns:
+            bool: 추천을 바로 처리할 수 있으면 True (로드에 실패한 경우 False)
+        """
+        return self._ready.is_set() and self._load_error is None
+    
+    def wait(self, timeout=None):
+        """
+        카탈로그와 모델이 준비될 때까지 기다립니다.
+        
+        Args:
+            timeout: 최대 대기 시간(초), None이면 준비될 때까지 대기
+        
+        Returns:
+            bool: 준비되었으면 True, timeout 안에 준비되지 않았으면 False
+        
+        Raises:
+            CatalogLoadError: 로드에 실패한 경우 (원래 오류는 __cause__)
+        """
+        if not self._ready.wait(timeout):
+            return False
+        if self._load_error is not None:
+            raise CatalogLoadError(f"와인 데이터를 불러오지 못했습니다: {str(self._load_error)}") from self._load_error
+        return True
+    
+    def _current_state(self):
+        """
+        현재 카탈로그 상태를 반환합니다. 아직 로드 중이면 준비될 때까지 기다립니다.
+        """
+        state = self._state
+        if state is None:
+            self.wait()
+            state = self._state
+        return state
+    
+    @property
+    def df(self):
+        """현재 카탈로그 데이터프레임"""
+        return self._current_state().df
+    
+    @property
+    def model(self):
+        """현재 카탈로그로 학습된 WineKNNModel"""
+        return self._current_state().model
+    
+    @property
+    def filter_index(self):
+        """현재 카탈로그의 WineFilterIndex"""
+        return self._current_state().filter_index
+    
+    @classmethod
+    def publish(cls, shared_dir, data_file="cleansingWine.csv", **kwargs):
+        """
+        카탈로그 스냅샷, 학습된 모델, 필터 인덱스를 공유 디렉터리에 저장합니다.
+        로더 프로세스에서 호출하고, 워커 프로세스는 attach()로 연결합니다.
+        
+        매번 새 버전 디렉터리(versions/<버전>)에 모두 쓴 뒤 마지막에 manifest(current.json)를
+        원자적으로 교체하므로, 워커는 쓰는 도중의 파일이나 서로 다른 버전의 모델과 필터 인덱스를
+        읽지 않습니다. 새 버전과 바로 이전 버전을 제외한 버전 디렉터리는 삭제합니다.
+        
+        Args:
+            shared_dir: 공유 디렉터리 경로
+            data_file: 와인 데이터 CSV 파일 경로
+            **kwargs: WineRecommender 생성 인자 (snapshot_dir, model_dir, watch_interval 제외)
+        
+        Returns:
+            WineRecommender: 공유 디렉터리의 데이터로 만든 추천 시스템 (로더 프로세스에서도 사용 가능)
+        """
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        version_dir = os.path.join(shared_dir, 'versions', version)
+        recommender = cls(
+            data_file,
+            snapshot_dir=os.path.join(version_dir, 'catalog'),
+            model_dir=os.path.join(version_dir, 'model'),
+            **kwargs
+        )
+        recommender.filter_index.save(os.path.join(version_dir, 'filters'))
+        
+        def write(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': version, 'n_wines': len(recommender.df)}, f, indent=2)
+        previous = cls.shared_version(shared_dir)
+        atomic_write(os.path.join(shared_dir, SHARED_MANIFEST), write)
+        
+        # 이전 버전은 아직 새 버전으로 옮기지 않은 워커가 연결할 수 있도록 남겨 둠
+        # (그보다 오래된 버전을 이미 메모리 매핑한 프로세스는 삭제된 파일도 계속 읽을 수 있음)
+        versions_dir = os.path.join(shared_dir, 'versions')
+        for name in os.listdir(versions_dir):
+            if name not in (version, previous):
+                shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+        return recommender
+    
+    @staticmethod
+    def shared_version(shared_dir):
+        """
+        공유 디렉터리에 현재 publish된 버전을 반환합니다.
+        
+        Args:
+            shared_dir: publish()에 사용한 공유 디렉터리 경로
+        
+        Returns:
+            str 또는 None: 현재 버전, 아직 publish되지 않았으면 None
+        """
+        try:
+            with open(os.path.join(shared_dir, SHARED_MANIFEST), encoding='utf-8') as f:
+                return json.load(f)['version']
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    @classmethod
+    def attach(cls, shared_dir, version=None, profile_cache_path="food_profile_cache.db", **gpt_options):
+        """
+        publish()로 저장한 공유 디렉터리에 읽기 전용으로 연결합니다.
+        카탈로그 컬럼, 정규화된 feature 행렬, 그리드 테이블, 필터 인덱스를 모두 메모리 매핑으로 읽어
+        프로세스마다 복사하지 않으며, 와인별 추천 결과 딕셔너리도 미리 만들지 않고
+        추천할 때 선택된 와인만 만듭니다.
+        
+        Args:
+            shared_dir: publish()에 사용한 공유 디렉터리 경로
+            version: 연결할 버전 (shared_version()의 반환값), None이면 현재 publish된 버전
+            profile_cache_path: GPT 프로파일 캐시 SQLite 파일 경로, None이면 캐시 사용 안 함
+            **gpt_options: GPT 호출 정책 (gpt_timeout, hedge_gpt, gpt_failure_threshold, gpt_cooldown,
+                local_threshold, gpt_max_in_flight)
+        
+        Returns:
+            WineRecommender: 공유 데이터를 사용하는 추천 시스템
+        
+        Raises:
+            ValueError: publish된 데이터가 없거나, 읽을 수 없거나, 서로 일치하지 않는 경우
+        """
+        if version is None:
+            version = cls.shared_version(shared_dir)
+            if version is None:
+                raise ValueError(f"공유 디렉터리에 publish된 데이터가 없습니다: {shared_dir}")
+        version_dir = os.path.join(shared_dir, 'versions', version)
+        catalog_dir = os.path.join(version_dir, 'catalog')
+        
+        try:
+            state = CatalogState(
+                load_catalog_snapshot(catalog_dir, mmap=True, include_text=False),
+                WineKNNModel.load(os.path.join(version_dir, 'model'), mmap=True),
+                WineFilterIndex.load(os.path.join(version_dir, 'filters'), mmap=True),
+                names=load_snapshot_text(catalog_dir, 'name'),
+                build_records=False,
+                next_id=snapshot_next_id(catalog_dir)
+            )
+        except (OSError, ValueError) as e:
+            raise ValueError(f"공유 디렉터리의 버전 {version}을 읽을 수 없습니다: {str(e)}") from e
+        
+        n_wines = len(state.df)
+        if state.model.n_samples != n_wines or state.filter_index.n_samples != n_wines:
+            raise ValueError(f"공유 디렉터리의 카탈로그, 모델, 필터 인덱스가 일치하지 않습니다: {version_dir}")
+        
+        recommender = cls.__new__(cls)
+        recommender.features = ['sweet', 'acidity', 'body', 'tannin']
+        recommender.data_file = None
+        recommender._update_lock = threading.Lock()
+        recommender._stop_watching = threading.Event()
+        recommender._watcher = None
+        recommender._ready = threading.Event()
+        recommender._ready.set()
+        recommender._load_error = None
+        recommender._state = state
+        recommender.profile_cache = FoodProfileCache(profile_cache_path) if profile_cache_path else None
+        recommender._init_gpt_policy(**gpt_options)
+        return recommender
+    
+    def _build_state(self):
+        """
+        데이터 파일로 카탈로그를 로드하고 모델과 인덱스를 만들어 새 상태를 반환합니다.
+        
+        Returns:
+            CatalogState: 새 카탈로그 상태
+        """
+        # 로드 중에 파일이 바뀌어도 다음 확인에서 다시 읽도록 로드 전에 파일 정보를 기록
+        source = file_signature(self.data_file)
+        
+        # 데이터 로드 및 전처리
+        print("데이터를 로드하는 중...")
+        df = load_prepared_catalog(self.data_file, **self._load_options)
+        
+        # 모델 생성 및 학습 (현재 데이터 파일로 학습해 저장한 모델이 있으면 불러옴)
+        model = self._load_or_fit_model(df, **self._model_settings)
+        
+        # 종류/국가/가격 조건 검색용 인덱스와 추천 결과로 반환할 와인별 딕셔너리 생성
+        # (이전에 add_wines()로 발급한 와인 id는 스냅샷에 기록되어 있음)
+        snapshot_dir = self._snapshot_dir()
+        next_id = snapshot_next_id(snapshot_dir) if snapshot_dir is not None else None
+        state = CatalogState(df, model, WineFilterIndex(df), source=source, next_id=next_id)
+        
+        print(f"완료! 총 {len(df)}개의 와인이 로드되었습니다.")
+        return state
+    
+    def _snapshot_dir(self):
+        """
+        카탈로그 스냅샷 디렉터리를 반환합니다. 스냅샷을 사용하지 않으면 None
+        """
+        if self.data_file is None or not self._load_options['use_snapshot']:
+            return None
+        return self._load_options['snapshot_dir'] or f"{self.data_file}.snapshot"
+    
+    def _load_or_fit_model(self, df, **settings):
+        """
+        model_dir에 같은 설정과 같은 데이터 파일로 학습한 모델이 있으면 불러오고,
+        없으면 새로 학습한 뒤 저장합니다.
+        
+        Args:
+            df: 전처리된 카탈로그 데이터프레임
+            **settings: WineKNNModel 생성 인자
+        
+        Returns:
+            WineKNNModel: 학습된 모델
+        """
+        model_dir = self._model_dir
+        metadata = {'data_file': file_signature(self.data_file)} if model_dir else None
+        
+        if model_dir is not None and os.path.exists(model_dir):
+            try:
+                model = WineKNNModel.load(model_dir)
+                same_settings = all(getattr(model, name) == value for name, value in settings.items())
+                if model.metadata == metadata and same_settings and model.n_samples == len(df):
+                    print("저장된 모델을 불러왔습니다.")
+                    return model
+            except Exception as e:
+                print(f"⚠️  저장된 모델 읽기 실패: {str(e)}")
+        
         print("모델을 학습하는 중...")
-        self.model = WineKNNModel(n_neighbors=n_neighbors)
-        self.model.fit(X)
+        model = WineKNNModel(**settings)
+        model.fit(df[self.features], order_key=df['price'])
+        
+        if model_dir is not None:
+            try:
+                model.save(model_dir, metadata=metadata)
+            except OSError as e:
+                print(f"⚠️  모델 저장 실패: {str(e)}")
+        
+        return model
+    
+    def reload(self, force=False):
+        """
+        데이터 파일이 바뀌었으면 카탈로그와 모델을 새로 만들어 현재 상태와 교체합니다.
+        새 상태를 만드는 동안에도 추천 요청은 이전 상태로 계속 처리됩니다.
+        add_wines()/remove_wines()로 반영한 변경은 데이터 파일에 없으므로 사라집니다.
+        
+        Args:
+            force: True이면 파일이 바뀌지 않았어도 다시 로드
+        
+        Returns:
+            bool: 상태를 교체했는지 여부
+        """
+        if self.data_file is None:
+            raise ValueError("attach()로 연결한 추천 시스템은 다시 로드할 수 없습니다.")
+        
+        with self._update_lock:
+            if not force and file_signature(self.data_file) == self._current_state().source:
+                return False
+            # 추가했던 와인은 사라지지만 그 id는 다시 발급하지 않음
+            new_state = self._build_state()
+            new_state.next_id = max(new_state.next_id, self._current_state().next_id)
+            # 이전 상태는 참조하는 요청이 모두 끝나면 해제됨 (샤드 워커 프로세스도 이때 종료)
+            self._state = new_state
+        return True
+    
+    def start_watching(self, interval=5.0):
+        """
+        백그라운드 스레드에서 interval초마다 데이터 파일을 확인하여, 바뀌었으면 reload()합니다.
+        파일을 쓰는 도중에 읽지 않도록, 두 번 연속 같은 파일 정보가 확인된 경우에만 다시 로드합니다.
+        
+        Args:
+            interval: 확인 간격(초) (기본값: 5.0)
+        """
+        if self.data_file is None:
+            raise ValueError("attach()로 연결한 추천 시스템은 데이터 파일을 감시할 수 없습니다.")
+        if self._watcher is not None and self._watcher.is_alive():
+            return
         
-        print(f"완료! 총 {len(self.df)}개의 와인이 로드되었습니다.")
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="wine-catalog-watcher", daemon=True
+        )
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """데이터 파일 감시 스레드를 종료합니다."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _watch(self, interval):
+        """
+        데이터 파일 감시 루프 (start_watching()의 백그라운드 스레드)
+        """
+        last_seen = None
+        while not self._stop_watching.wait(interval):
+            try:
+                signature = file_signature(self.data_file)
+                if signature != self._state.source and signature == last_seen:
+                    print("데이터 파일 변경을 감지했습니다. 카탈로그를 다시 로드합니다...")
+                    self.reload()
+                last_seen = signature
+            except Exception as e:
+                print(f"⚠️  카탈로그 다시 로드 실패: {str(e)}")
+    
+    def add_wines(self, df_delta):
+        """
+        새 와인을 카탈로그에 추가합니다.
+        추가된 행만 전처리하고 정규화하여 모델 복사본에 추가한 뒤 새 상태로 교체하며,
+        원본 CSV 파일은 변경하지 않습니다.
+        
+        Args:
+            df_delta: cleansingWine.csv와 같은 형식의 원본 데이터프레임
+        
+        Returns:
+            numpy array: 추가된 와인의 id 배열 (전처리에서 제외된 행은 포함되지 않음)
+        """
+        new_wines = prepare_features(df_delta)
+        if len(new_wines) == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        with self._update_lock:
+            state = self._current_state()
+            self._check_writable(state)
+            
+            # 와인 id는 데이터프레임 인덱스 (삭제나 다시 로드 후에도 재사용하지 않음)
+            start = state.next_id
+            new_wines.index = pd.RangeIndex(start, start + len(new_wines))
+            
+            df = compact_catalog_dtypes(pd.concat([state.df, new_wines]))
+            model = state.model.copy()
+            model.add_samples(new_wines[self.features], order_key=new_wines['price'])
+            
+            new_state = CatalogState(
+                df, model, WineFilterIndex(df), source=state.source, build_records=False,
+                next_id=start + len(new_wines)
+            )
+            new_state.records = np.concatenate([
+                state.records, new_state.build_records(np.arange(len(state.df), len(df)))
+            ])
+            
+            # 다시 시작한 뒤에도 발급한 id를 재사용하지 않도록 스냅샷에 기록
+            snapshot_dir = self._snapshot_dir()
+            if snapshot_dir is not None:
+                try:
+                    record_snapshot_next_id(snapshot_dir, new_state.next_id)
+                except OSError as e:
+                    print(f"⚠️  와인 id 기록 실패: {str(e)}")
+            self._state = new_state
+        
+        return new_wines.index.to_numpy()
+    
+    def remove_wines(self, ids):
+        """
+        카탈로그에서 와인을 삭제합니다. 원본 CSV 파일은 변경하지 않습니다.
+        
+        Args:
+            ids: 삭제할 와인 id 리스트 (추천 결과의 'id' 또는 add_wines()의 반환값)
+        """
+        ids = pd.Index(ids).unique()
+        
+        with self._update_lock:
+            state = self._current_state()
+            self._check_writable(state)
+            
+            rows = state.df.index.get_indexer(ids)
+            if (rows < 0).any():
+                raise ValueError(f"카탈로그에 없는 와인 id: {ids[rows < 0].tolist()}")
+            if len(rows) == 0:
+                return
+            
+            model = state.model.copy()
+            model.remove_samples(rows)
+            df = state.df.drop(index=state.df.index[rows])
+            
+            new_state = CatalogState(
+                df, model, WineFilterIndex(df), source=state.source, build_records=False, next_id=state.next_id
+            )
+            new_state.records = np.delete(state.records, rows)
+            self._state = new_state
+    
+    @staticmethod
+    def _check_writable(state):
+        """
+        attach()로 연결한 읽기 전용 상태이면 오류를 발생시킵니다.
+        """
+        if state.records is None:
+            raise ValueError("attach()로 연결한 추천 시스템은 카탈로그를 변경할 수 없습니다.")
     
     def get_food_profile(self, food_name, use_gpt=True):
         """
         음식 이름으로 프로파일을 가져옵니다.
-        GPT API를 사용하여 프로파일을 생성하고, 실패 시 기존 프로파일을 사용합니다.
+        캐시에 저장된 GPT 프로파일을 먼저 확인하고, 로컬 예측기가 있으면 이름이 충분히 비슷한
+        음식의 프로파일을 사용하며, 그래도 없으면 GPT API로 생성합니다.
+        GPT API 호출이 실패하거나 gpt_timeout 안에 끝나지 않으면 기존 프로파일을 사용합니다.
+        연속 실패로 서킷 브레이커가 열려 있는 동안에는 GPT API를 호출하지 않습니다.
         
         Args:
             food_name: 음식 이름
@@ -59,20 +714,181 @@ class WineRecommender:
         Returns:
             tuple: (프로파일 리스트, 프로파일 소스, 설명)
                 - 프로파일: [sweet, acidity, body, tannin]
-                - 프로파일 소스: 'gpt' 또는 'fallback'
-                - 설명: 프로파일 설명 (GPT의 경우 상세 설명, fallback의 경우 기본 메시지)
+                - 프로파일 소스: 'cache', 'local', 'gpt' 또는 'fallback'
+                - 설명: 프로파일 설명 (GPT/cache의 경우 상세 설명, local의 경우 비슷한 음식의 설명,
+                    fallback의 경우 기본 메시지)
         """
-        food_name_clean = food_name.strip().lower()
+        saved = self._get_saved_profile(food_name, use_gpt)
+        if saved is not None:
+            return saved
         
         # GPT API로 프로파일 생성 시도
-        if use_gpt:
+        if use_gpt and not self.gpt_breaker.allow():
+            print("⚠️  GPT API 연속 실패로 잠시 호출을 멈췄습니다. 기존 프로파일을 사용합니다...")
+        elif use_gpt:
             try:
-                profile, description = get_food_profile_from_gpt(food_name)
+                profile, description = self._request_gpt_profile(food_name)
+                self.gpt_breaker.record_success()
+                self._store_profile(food_name, profile, description)
                 return profile, 'gpt', description
             except Exception as e:
+                self.gpt_breaker.record_failure()
                 print(f"⚠️  GPT API 호출 실패: {str(e)}")
                 print("기존 프로파일을 사용합니다...")
         
+        return self._get_fallback_profile(food_name)
+    
+    def get_food_profile_stream(self, food_name, use_gpt=True):
+        """
+        get_food_profile()의 스트리밍 버전입니다.
+        GPT API로 생성하는 경우 네 값이 도착하는 즉시 프로파일을 반환하고,
+        설명은 반환된 iterator에서 도착하는 대로 받을 수 있습니다. (설명을 끝까지 받으면 캐시에 저장)
+        프로파일이 도착하기 전에 실패하면 기존 프로파일을 사용합니다.
+        
+        Args:
+            food_name: 음식 이름
+            use_gpt: GPT API 사용 여부 (기본값: True)
+        
+        Returns:
+            tuple: (프로파일 리스트, 프로파일 소스, 설명 텍스트 조각 iterator)
+                - 프로파일, 프로파일 소스: get_food_profile()과 같음
+                - 설명 조각: GPT가 아닌 경우 전체 설명 하나
+        """
+        saved = self._get_saved_profile(food_name, use_gpt)
+        if saved is not None:
+            profile, source, description = saved
+            return profile, source, iter([description])
+        
+        if use_gpt and not self.gpt_breaker.allow():
+            print("⚠️  GPT API 연속 실패로 잠시 호출을 멈췄습니다. 기존 프로파일을 사용합니다...")
+        elif use_gpt:
+            try:
+                events = stream_food_profile_from_gpt(food_name, timeout=self.gpt_timeout)
+                # 스트림은 항상 프로파일을 먼저 돌려줌
+                _, profile = next(events)
+                # 프로파일이 도착하면 API가 응답한 것이므로 바로 성공으로 기록
+                # (설명 iterator는 끝까지 읽히지 않고 버려질 수 있음, 예: Streamlit 재실행)
+                self.gpt_breaker.record_success()
+                return profile, 'gpt', self._stream_description(food_name, profile, events)
+            except Exception as e:
+                self.gpt_breaker.record_failure()
+                print(f"⚠️  GPT API 호출 실패: {str(e)}")
+                print("기존 프로파일을 사용합니다...")
+        
+        profile, source, description = self._get_fallback_profile(food_name)
+        return profile, source, iter([description])
+    
+    def get_food_profiles(self, food_names, use_gpt=True, max_workers=4):
+        """
+        여러 음식의 프로파일을 한 번에 가져옵니다. (대량 작업용)
+        캐시나 로컬 예측기에 없는 음식만 모아 GPT API에 묶어서 요청하고 (전체 요청은 gpt_timeout 안에 끝남),
+        끝내 받지 못한 음식은 기존 프로파일을 사용합니다.
+        
+        Args:
+            food_names: 음식 이름 리스트
+            use_gpt: GPT API 사용 여부 (기본값: True)
+            max_workers: 동시에 보낼 최대 GPT 요청 수 (기본값: 4)
+        
+        Returns:
+            list: 입력 순서대로 get_food_profile()과 같은 (프로파일, 프로파일 소스, 설명) 튜플,
+                프로파일을 찾지 못한 음식은 그 오류(ValueError)
+        """
+        food_names = list(food_names)
+        results = [self._get_saved_profile(food_name, use_gpt) for food_name in food_names]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        generated = {}
+        if use_gpt and missing and not self.gpt_breaker.allow():
+            print("⚠️  GPT API 연속 실패로 잠시 호출을 멈췄습니다. 기존 프로파일을 사용합니다...")
+        elif use_gpt and missing:
+            errors = []
+            try:
+                generated = get_food_profiles_from_gpt_bulk(
+                    [food_names[i] for i in missing], max_workers=max_workers,
+                    timeout=self.gpt_timeout, errors=errors
+                )
+                # 일부 요청만 실패해도 API 상태를 반영하도록 실패로 기록
+                if errors:
+                    self.gpt_breaker.record_failure()
+                    print(f"⚠️  일부 GPT API 요청 실패: {str(errors[-1])}")
+                else:
+                    self.gpt_breaker.record_success()
+            except Exception as e:
+                self.gpt_breaker.record_failure()
+                print(f"⚠️  GPT API 호출 실패: {str(e)}")
+                print("기존 프로파일을 사용합니다...")
+        
+        for i in missing:
+            food_name = food_names[i]
+            if food_name in generated:
+                profile, description = generated[food_name]
+                self._store_profile(food_name, profile, description)
+                results[i] = (profile, 'gpt', description)
+                continue
+            try:
+                results[i] = self._get_fallback_profile(food_name)
+            except ValueError as e:
+                results[i] = e
+        return results
+    
+    def _stream_description(self, food_name, profile, events):
+        """
+        GPT 스트림의 남은 설명 조각을 돌려주고, 끝까지 받으면 프로파일을 캐시에 저장합니다.
+        프로파일을 받은 뒤의 실패는 설명만 중단합니다. (이미 반환한 프로파일은 그대로 사용)
+        중간에 버려지면 (GeneratorExit) HTTP 스트림을 닫습니다.
+        """
+        parts = []
+        try:
+            for _, text in events:
+                parts.append(text)
+                yield text
+        except Exception as e:
+            self.gpt_breaker.record_failure()
+            print(f"⚠️  GPT 프로파일 설명 수신 실패: {str(e)}")
+            return
+        finally:
+            events.close()
+        self._store_profile(food_name, profile, ''.join(parts))
+    
+    def _get_saved_profile(self, food_name, use_gpt):
+        """
+        캐시에 저장된 GPT 프로파일 또는 로컬 예측기의 프로파일을 찾습니다.
+        
+        Returns:
+            tuple 또는 None: (프로파일 리스트, 'cache' 또는 'local', 설명), 없으면 None
+        """
+        # 캐시된 GPT 프로파일 확인
+        if use_gpt and self.profile_cache is not None:
+            try:
+                cached = self.profile_cache.get(food_name)
+            except Exception as e:
+                print(f"⚠️  프로파일 캐시 조회 실패: {str(e)}")
+                cached = None
+            if cached is not None:
+                profile, description = cached
+                return profile, 'cache', description
+        
+        # 이름이 비슷한 음식의 GPT 프로파일로 예측
+        if use_gpt and self.profile_predictor is not None:
+            prediction = self.profile_predictor.predict_confident(food_name)
+            if prediction is not None:
+                profile, matched_name, similarity, matched_description = prediction
+                description = f"비슷한 음식 '{matched_name}'의 프로파일을 사용합니다. (유사도 {similarity:.2f})"
+                if matched_description:
+                    description += f"\n\n{matched_description}"
+                return profile, 'local', description
+        
+        return None
+    
+    def _get_fallback_profile(self, food_name):
+        """
+        기본 프로파일 목록(FOOD_PROFILES)에서 프로파일을 찾습니다.
+        
+        Raises:
+            ValueError: 기본 프로파일에도 없는 음식인 경우
+        """
+        food_name_clean = food_name.strip().lower()
+        
         # Fallback: 기존 프로파일 사용
         if food_name_clean in FOOD_PROFILES:
             description = f"{food_name}에 어울리는 기본 와인 프로파일입니다."
@@ -85,42 +901,96 @@ class WineRecommender:
             f"기본 프로파일 목록: {', '.join(FOOD_PROFILES.keys())}"
         )
     
-    def recommend(self, food_name, use_gpt=True):
+    def _request_gpt_profile(self, food_name):
+        """
+        gpt_timeout 안에서 GPT 프로파일을 요청합니다.
+        시간이 초과되어도 요청은 gpt_timeout * GPT_LATE_TIMEOUT_FACTOR까지 계속 진행되며,
+        늦게 도착한 결과는 캐시에 저장하여 다음 요청에 사용합니다.
+        
+        Raises:
+            TimeoutError: gpt_timeout 안에 응답이 없는 경우
+            RuntimeError: 진행 중인 요청이 gpt_max_in_flight개여서 새 요청을 보낼 수 없는 경우
+        """
+        if self.gpt_timeout is None:
+            return get_food_profile_from_gpt(food_name, hedge=self.hedge_gpt)
+        
+        # API가 응답하지 않을 때 새 요청이 앞선 요청 뒤에서 gpt_timeout을 다 써 버리지 않도록 바로 거절
+        if not self._gpt_slots.acquire(blocking=False):
+            raise RuntimeError("진행 중인 GPT 요청이 너무 많습니다.")
+        try:
+            future = self._gpt_executor.submit(
+                get_food_profile_from_gpt, food_name, self.hedge_gpt, self.gpt_timeout * GPT_LATE_TIMEOUT_FACTOR
+            )
+        except BaseException:
+            self._gpt_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._gpt_slots.release())
+        try:
+            return future.result(timeout=self.gpt_timeout)
+        except FutureTimeoutError:
+            if future.done():
+                # 시간 초과와 확인 사이에 끝난 응답은 버리지 않고 사용
+                if future.exception() is None:
+                    return future.result()
+                raise
+            future.add_done_callback(partial(self._store_late_profile, food_name))
+            raise TimeoutError(f"{self.gpt_timeout}초 안에 응답이 없습니다.")
+    
+    def _store_late_profile(self, food_name, future):
+        """
+        시간 초과 뒤에 도착한 GPT 프로파일을 캐시에 저장합니다.
+        """
+        if not future.cancelled() and future.exception() is None:
+            profile, description = future.result()
+            self._store_profile(food_name, profile, description)
+    
+    def _store_profile(self, food_name, profile, description):
+        """
+        GPT 프로파일을 캐시와 로컬 예측기에 저장합니다. (실패해도 추천은 계속 진행)
+        """
+        if self.profile_predictor is not None:
+            try:
+                self.profile_predictor.add(food_name, profile, description)
+            except Exception as e:
+                print(f"⚠️  로컬 프로파일 예측기 갱신 실패: {str(e)}")
+        if self.profile_cache is not None:
+            try:
+                self.profile_cache.set(food_name, profile, description)
+            except Exception as e:
+                print(f"⚠️  프로파일 캐시 저장 실패: {str(e)}")
+    
+    def recommend(self, food_name, use_gpt=True, k=None, wine_type=None, nation=None,
+                  min_price=None, max_price=None):
         """
         음식에 맞는 와인을 추천합니다.
+        검색 조건을 지정하면 조건을 만족하는 와인 중에서 가장 가까운 와인을 찾습니다.
         
         Args:
             food_name: 음식 이름
             use_gpt: GPT API 사용 여부 (기본값: True)
+            k: 추천할 와인 개수, None이면 n_neighbors 사용 (최대: 전체 와인 개수)
+            wine_type: 와인 종류 또는 종류 리스트 (예: 'Red', ['Red', 'Rose'])
+            nation: 국가 또는 국가 리스트 (예: 'France')
+            min_price: 최저 가격 (포함)
+            max_price: 최고 가격 (포함)
         
         Returns:
             tuple: (추천 와인 리스트, 프로파일 정보)
                 - 추천 와인 리스트: 각 딕셔너리는 {'name', 'sweet', 'acidity', 'body', 'tannin', 'distance'} 포함
-                - 프로파일 정보: {'profile': [sweet, acidity, body, tannin], 'source': 'gpt' 또는 'fallback', 'description': 설명 문자열}
+                - 프로파일 정보: {'profile': [sweet, acidity, body, tannin], 'source': 'cache', 'gpt' 또는 'fallback', 'description': 설명 문자열}
         """
         # 음식 프로파일 가져오기
         food_profile, profile_source, description = self.get_food_profile(food_name, use_gpt=use_gpt)
         
-        # 가장 가까운 와인 찾기
-        distances, indices = self.model.predict(food_profile)
+        # 가장 가까운 와인 찾기 (요청 동안 같은 카탈로그 상태 사용)
+        state = self._current_state()
+        candidates = state.filter_index.candidates(
+            wine_type=wine_type, nation=nation, min_price=min_price, max_price=max_price
+        )
+        distances, indices = state.model.predict(food_profile, k=k, candidates=candidates)
         
         # 결과 구성
-        recommendations = []
-        for i, idx in enumerate(indices[0]):
-            wine = self.df.iloc[idx]
-            recommendations.append({
-                'name': wine['name'],
-                'sweet': int(wine['sweet']),
-                'acidity': int(wine['acidity']),
-                'body': int(wine['body']),
-                'tannin': int(wine['tannin']),
-                'price': float(wine['price']),
-                'abv': float(wine['abv']) if pd.notna(wine['abv']) else None,
-                'type': wine['type'] if 'type' in wine and pd.notna(wine['type']) else None,
-                'nation': wine['nation'] if 'nation' in wine and pd.notna(wine['nation']) else None,
-                'year': int(wine['year']) if pd.notna(wine['year']) else None,
-                'distance': float(distances[0][i])
-            })
+        recommendations = state.build_recommendations(distances, indices)[0]
         
         profile_info = {
             'profile': food_profile,
@@ -130,6 +1000,197 @@ class WineRecommender:
         
         return recommendations, profile_info
     
+    def recommend_page(self, food_name=None, page_size=None, cursor=None, use_gpt=True, profile_info=None,
+                       **filters):
+        """
+        음식에 맞는 와인을 페이지 단위로 추천합니다. ("더 보기" 기능용)
+        첫 페이지는 food_name으로 요청하고, 다음 페이지는 반환된 커서로 요청합니다.
+        
+        Args:
+            food_name: 음식 이름 (첫 페이지에서만 사용)
+            page_size: 페이지 크기, None이면 커서의 페이지 크기 또는 n_neighbors 사용
+            cursor: 이전 호출이 반환한 RecommendationCursor (첫 페이지는 None)
+            use_gpt: GPT API 사용 여부 (첫 페이지에서만 사용, 기본값: True)
+            profile_info: 이미 가져온 프로파일 정보 (첫 페이지에서 food_name 대신 사용)
+            **filters: recommend()와 같은 검색 조건 (첫 페이지에서만 사용, 이후 커서에 보관)
+        
+        Returns:
+            tuple: (추천 와인 리스트, 프로파일 정보, 다음 페이지 커서)
+                - 추천 와인 리스트, 프로파일 정보: recommend()와 같은 형식
+                - 다음 페이지 커서: 더 이상 와인이 없으면 None
+        """
+        if cursor is None:
+            if profile_info is None:
+                if food_name is None:
+                    raise ValueError("첫 페이지는 food_name이 필요합니다.")
+                food_profile, profile_source, description = self.get_food_profile(food_name, use_gpt=use_gpt)
+                profile_info = {
+                    'profile': food_profile,
+                    'source': profile_source,
+                    'description': description
+                }
+            
+            # 프로파일을 가져온 뒤 카탈로그 상태 사용 (lazy 로드 중이면 여기서 대기)
+            state = self._current_state()
+            ranked_distances = np.empty(0)
+            ranked_indices = np.empty(0, dtype=np.intp)
+            offset = 0
+            page_size = page_size or state.model.n_neighbors
+        else:
+            state = self._current_state()
+            profile_info = cursor.profile_info
+            filters = cursor.filters
+            ranked_distances, ranked_indices = cursor.distances, cursor.indices
+            offset = cursor.offset
+            page_size = page_size or cursor.page_size
+            
+            # 커서를 만든 뒤 모델이나 와인 목록이 바뀌었으면 순위를 다시 계산
+            if cursor.model is not state.model or cursor.model_version != state.model.version:
+                ranked_distances = np.empty(0)
+                ranked_indices = np.empty(0, dtype=np.intp)
+        
+        candidates = state.filter_index.candidates(**filters)
+        n_samples = state.model.n_samples if candidates is None else len(candidates)
+        end = min(offset + page_size, n_samples)
+        
+        # 보관된 순위가 부족하면 더 큰 k로 검색하여 이어 붙임 (이미 반환한 순서는 유지)
+        if end > len(ranked_indices):
+            k = min(n_samples, max(end, 2 * len(ranked_indices)))
+            distances, indices = state.model.predict(profile_info['profile'], k=k, candidates=candidates)
+            is_new = ~np.isin(indices[0], ranked_indices)
+            ranked_distances = np.concatenate([ranked_distances, distances[0][is_new]])
+            ranked_indices = np.concatenate([ranked_indices, indices[0][is_new]])
+        
+        recommendations = state.build_recommendations(
+            ranked_distances[None, offset:end], ranked_indices[None, offset:end]
+        )[0]
+        
+        next_cursor = None
+        if end < n_samples:
+            next_cursor = RecommendationCursor(
+                state.model, profile_info, ranked_distances, ranked_indices, end, page_size, filters
+            )
+        
+        return recommendations, profile_info, next_cursor
+    
+    def recommend_page_stream(self, food_name, page_size=None, use_gpt=True, **filters):
+        """
+        recommend_page()의 첫 페이지를 스트리밍으로 요청합니다.
+        GPT 프로파일의 네 값이 도착하는 즉시 와인을 검색하여 반환하고, 설명은 반환된 iterator로 받습니다.
+        설명 조각을 받는 동안 프로파일 정보의 'description'에도 이어 붙이므로,
+        끝까지 받은 뒤에는 커서의 프로파일 정보에도 전체 설명이 들어 있습니다.
+        
+        Args:
+            food_name: 음식 이름
+            page_size: 페이지 크기, None이면 n_neighbors 사용
+            use_gpt: GPT API 사용 여부 (기본값: True)
+            **filters: recommend()와 같은 검색 조건
+        
+        Returns:
+            tuple: (추천 와인 리스트, 프로파일 정보, 다음 페이지 커서, 설명 텍스트 조각 iterator)
+                - 프로파일 정보의 'description'은 빈 문자열에서 시작
+        """
+        food_profile, profile_source, description_chunks = self.get_food_profile_stream(food_name, use_gpt=use_gpt)
+        profile_info = {
+            'profile': food_profile,
+            'source': profile_source,
+            'description': ''
+        }
+        recommendations, profile_info, cursor = self.recommend_page(
+            page_size=page_size, profile_info=profile_info, **filters
+        )
+        
+        def description_stream():
+            for text in description_chunks:
+                profile_info['description'] += text
+                yield text
+        
+        return recommendations, profile_info, cursor, description_stream()
+    
+    def recommend_many(self, food_names, use_gpt=True, max_workers=8, k=None, bulk_gpt=False, **filters):
+        """
+        여러 음식에 대한 와인을 한 번에 추천합니다.
+        음식 프로파일은 스레드 풀에서 음식별로 동시에 가져오거나 GPT API에 여러 음식을 묶어 요청하고(bulk_gpt=True),
+        KNN 검색은 모든 프로파일을 묶어 한 번만 수행합니다.
+        
+        Args:
+            food_names: 음식 이름 리스트
+            use_gpt: GPT API 사용 여부 (기본값: True)
+            max_workers: 동시에 보낼 최대 GPT 요청 수 (기본값: 8)
+            k: 음식별 추천 와인 개수, None이면 n_neighbors 사용
+            bulk_gpt: 캐시에 없는 음식들을 GPT API 요청 하나에 묶어 보낼지 여부
+                (대량 작업용, 요청 수는 줄지만 hedge_gpt는 적용되지 않음, 기본값: False)
+            **filters: recommend()와 같은 검색 조건 (모든 음식에 동일하게 적용)
+        
+        Returns:
+            list: 입력 순서대로 (추천 와인 리스트, 프로파일 정보) 튜플의 리스트
+                - 각 항목의 형식은 recommend()의 반환값과 같습니다.
+                - 프로파일을 가져오지 못한 음식은 ([], {'profile': None, 'source': 'error', 'description': 오류 메시지})
+        """
+        food_names = list(food_names)
+        if not food_names:
+            return []
+        
+        # 음식 프로파일 조회 (묶어서 요청하거나 음식별로 동시에 요청)
+        if bulk_gpt:
+            outcomes = self.get_food_profiles(food_names, use_gpt=use_gpt, max_workers=max_workers)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(food_names))) as executor:
+                futures = [
+                    executor.submit(self.get_food_profile, food_name, use_gpt)
+                    for food_name in food_names
+                ]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        
+        results = [None] * len(food_names)
+        resolved = []
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                results[i] = ([], {'profile': None, 'source': 'error', 'description': str(outcome)})
+            else:
+                resolved.append((i, outcome))
+        
+        if resolved:
+            # 모든 프로파일을 한 번의 KNN 검색으로 처리
+            profiles = np.array([profile for _, (profile, _, _) in resolved])
+            state = self._current_state()
+            candidates = state.filter_index.candidates(**filters)
+            distances, indices = state.model.predict(profiles, k=k, candidates=candidates)
+            batches = state.build_recommendations(distances, indices)
+            
+            for (i, (profile, source, description)), recommendations in zip(resolved, batches):
+                results[i] = (recommendations, {
+                    'profile': profile,
+                    'source': source,
+                    'description': description
+                })
+        
+        return results
+    
+    def memory_report(self):
+        """
+        와인 카탈로그 데이터프레임의 메모리 사용량을 반환합니다.
+        
+        Returns:
+            dict: {'n_wines': 와인 개수, 'total_bytes': 전체 바이트 수,
+                   'bytes_per_wine': 와인당 바이트 수, 'columns': {컬럼: 바이트 수}}
+        """
+        usage = self.df.memory_usage(deep=True, index=True)
+        total_bytes = int(usage.sum())
+        n_wines = len(self.df)
+        
+        return {
+            'n_wines': n_wines,
+            'total_bytes': total_bytes,
+            'bytes_per_wine': total_bytes / n_wines if n_wines else 0.0,
+            'columns': {column: int(usage[column]) for column in self.df.columns},
+        }
+    
     def get_available_foods(self):
         """
         사용 가능한 음식 목록을 반환합니다.
@@ -138,4 +1199,15 @@ class WineRecommender:
             list: 음식 이름 리스트
         """
         return list(FOOD_PROFILES.keys())
-
+    
+    def close(self):
+        """
+        데이터 파일 감시 스레드, 검색 워커 프로세스, 프로파일 캐시 연결 등 사용 중인 자원을 해제합니다.
+        """
+        self.stop_watching()
+        # 로드에 실패했거나 아직 로드 중이면 닫을 모델이 없음
+        if self._state is not None:
+            self._state.model.close()
+        self._gpt_executor.shutdown(wait=False, cancel_futures=True)
+        if self.profile_cache is not None:
+            self.profile_cache.close()
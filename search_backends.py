@@ -0,0 +1,238 @@
+"""
+최근접 이웃 검색 백엔드 모듈
+정규화된 와인 feature 행렬에서 가장 가까운 이웃을 찾는 구현들과,
+카탈로그 크기와 질의 개수에 따라 백엔드를 고르는 정책을 제공합니다.
+"""
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.neighbors import BallTree, KDTree
+
+
+# brute force를 사용할 최대 작업량 (학습 데이터 개수 x 질의 개수)
+# benchmark.py의 search_backends 결과 기준: 이 값 이하에서는 트리 질의의 고정 오버헤드(~150us)가
+# 전체 거리 계산보다 크고, 이보다 크면 KD-tree가 빠릅니다.
+BRUTE_MAX_WORK = 5000
+
+# brute force 계산 시 한 번에 만드는 거리 행렬의 최대 원소 수 (메모리 사용량 제한)
+BRUTE_CHUNK_ELEMENTS = 1 << 20
+
+
+def brute_force_kneighbors(X, Q, k):
+    """
+    모든 학습 데이터와의 거리를 직접 계산하여 가장 가까운 k개를 찾습니다.
+    거리가 같으면 인덱스가 작은 순서로 정렬합니다.
+
+    Args:
+        X: 학습 데이터 (shape: (n_samples, n_features))
+        Q: 질의 데이터 (shape: (n_queries, n_features))
+        k: 찾을 이웃 개수 (n_samples 이하)
+
+    Returns:
+        tuple: (distances, indices) (shape: (n_queries, k))
+    """
+    n_samples = X.shape[0]
+    Q = np.asarray(Q, dtype=X.dtype)
+    distances = np.empty((Q.shape[0], k))
+    indices = np.empty((Q.shape[0], k), dtype=np.intp)
+
+    chunk = max(1, BRUTE_CHUNK_ELEMENTS // max(n_samples, 1))
+    for start in range(0, Q.shape[0], chunk):
+        Q_chunk = Q[start:start + chunk]
+        diff = Q_chunk[:, None, :] - X[None, :, :]
+        # 반환하는 거리(제곱근) 기준으로 선택/정렬해야 결과를 합칠 때(sharded)도 같은 순서가 됨
+        row_distances = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+        if k < n_samples:
+            top = np.argpartition(row_distances, k - 1, axis=1)[:, :k]
+            # k번째 거리와 같은 와인이 잘려 나간 행은 전체를 정렬하여 인덱스가 작은 와인을 선택
+            kth = np.take_along_axis(row_distances, top, axis=1).max(axis=1)
+            tied = np.flatnonzero(np.count_nonzero(row_distances <= kth[:, None], axis=1) > k)
+            for i in tied:
+                top[i] = np.argsort(row_distances[i], kind='stable')[:k]
+        else:
+            top = np.broadcast_to(np.arange(n_samples), row_distances.shape)
+        top_distances = np.take_along_axis(row_distances, top, axis=1)
+        order = np.lexsort((top, top_distances), axis=1)
+
+        distances[start:start + chunk] = np.take_along_axis(top_distances, order, axis=1)
+        indices[start:start + chunk] = np.take_along_axis(top, order, axis=1)
+
+    return distances, indices
+
+
+class BruteForceBackend:
+    """
+    NumPy로 전체 거리를 계산하는 백엔드 (euclidean 전용)
+    작은 카탈로그나 적은 질의에서는 sklearn의 입력 검증과 트리 탐색 오버헤드가 없어 가장 빠릅니다.
+    """
+
+    name = 'brute'
+
+    def __init__(self, X, metric='euclidean'):
+        if metric != 'euclidean':
+            raise ValueError(f"brute 백엔드는 euclidean 거리만 지원합니다: {metric}")
+        self.X = X
+
+    def kneighbors(self, Q, k):
+        return brute_force_kneighbors(self.X, Q, k)
+
+
+class KDTreeBackend:
+    """
+    sklearn KDTree 백엔드
+    feature 수가 적고 카탈로그가 큰 경우 질의당 비용이 거의 일정합니다.
+    """
+
+    name = 'kd_tree'
+
+    def __init__(self, X, metric='euclidean'):
+        self.tree = KDTree(X, metric=metric)
+
+    def kneighbors(self, Q, k):
+        return self.tree.query(Q, k=k)
+
+
+class BallTreeBackend:
+    """
+    sklearn BallTree 백엔드
+    KDTree가 지원하지 않는 거리 계산 방법에 사용합니다.
+    """
+
+    name = 'ball_tree'
+
+    def __init__(self, X, metric='euclidean'):
+        self.tree = BallTree(X, metric=metric)
+
+    def kneighbors(self, Q, k):
+        return self.tree.query(Q, k=k)
+
+
+class IVFBackend:
+    """
+    IVF(inverted file) 방식의 근사 최근접 이웃 백엔드 (euclidean 전용, 명시적으로 선택할 때만 사용)
+    학습 데이터를 k-means로 n_lists개의 클러스터로 나누고, 질의와 가까운 n_probe개 클러스터 안에서만
+    거리를 계산합니다. n_probe가 클수록 정확도(recall)가 높아지고 느려집니다.
+    """
+
+    name = 'ivf'
+
+    def __init__(self, X, metric='euclidean', n_lists=None, n_probe=8, random_state=0):
+        """
+        Args:
+            X: 정규화된 학습 데이터
+            metric: 거리 계산 방법 ('euclidean'만 지원)
+            n_lists: 클러스터 개수, None이면 sqrt(n_samples)
+            n_probe: 질의마다 탐색할 클러스터 개수 (속도/정확도 조절값, 기본값: 8)
+            random_state: k-means 난수 시드 (같은 데이터에서 항상 같은 인덱스 생성)
+        """
+        if metric != 'euclidean':
+            raise ValueError(f"ivf 백엔드는 euclidean 거리만 지원합니다: {metric}")
+
+        n_samples = X.shape[0]
+        if n_lists is None:
+            n_lists = int(np.sqrt(n_samples))
+        n_lists = max(1, min(n_lists, n_samples))
+        self.n_probe = n_probe
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_lists, n_init=1, batch_size=4096, random_state=random_state
+        ).fit(X)
+        self.centroids = kmeans.cluster_centers_.astype(X.dtype)
+        labels = kmeans.labels_
+
+        # 클러스터별로 모은 행 인덱스와 데이터 (클러스터 c의 행: list_rows[offsets[c]:offsets[c + 1]])
+        self.list_rows = np.argsort(labels, kind='stable')
+        self.list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))])
+        self.list_X = np.ascontiguousarray(X[self.list_rows])
+
+    def kneighbors(self, Q, k):
+        Q = np.asarray(Q, dtype=self.centroids.dtype)
+        n_lists = len(self.centroids)
+        distances = np.empty((Q.shape[0], k))
+        indices = np.empty((Q.shape[0], k), dtype=np.intp)
+
+        _, probe_order = brute_force_kneighbors(self.centroids, Q, n_lists)
+        sizes = np.diff(self.list_offsets)
+        for i, lists in enumerate(probe_order):
+            # 탐색한 클러스터의 행이 k개보다 적으면 다음 클러스터까지 탐색
+            n_probe = min(self.n_probe, n_lists)
+            covered = np.cumsum(sizes[lists])
+            n_probe = max(n_probe, int(np.searchsorted(covered, k)) + 1)
+            lists = lists[:n_probe]
+
+            positions = np.concatenate([
+                np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in lists
+            ])
+            row_distances, top = brute_force_kneighbors(self.list_X[positions], Q[i:i + 1], k)
+            distances[i] = row_distances[0]
+            indices[i] = self.list_rows[positions[top[0]]]
+
+        return distances, indices
+
+
+BACKENDS = {
+    'brute': BruteForceBackend,
+    'kd_tree': KDTreeBackend,
+    'ball_tree': BallTreeBackend,
+    'ivf': IVFBackend,
+}
+
+
+def select_backend(n_samples, batch_size=1, metric='euclidean'):
+    """
+    카탈로그 크기와 질의 개수에 맞는 백엔드 이름을 고릅니다.
+
+    Args:
+        n_samples: 학습 데이터 개수
+        batch_size: 한 번에 검색하는 질의 개수
+        metric: 거리 계산 방법
+
+    Returns:
+        str: 'brute', 'kd_tree' 또는 'ball_tree' (근사 검색 'ivf'는 자동으로 고르지 않음)
+    """
+    if metric == 'euclidean' and n_samples * batch_size <= BRUTE_MAX_WORK:
+        return 'brute'
+    if metric in KDTree.valid_metrics:
+        return 'kd_tree'
+    return 'ball_tree'
+
+
+def make_backend(name, X, metric='euclidean', **options):
+    """
+    이름에 해당하는 백엔드를 생성합니다.
+
+    Args:
+        name: 'brute', 'kd_tree', 'ball_tree', 'ivf' 또는 'sharded'
+        X: 정규화된 학습 데이터
+        metric: 거리 계산 방법
+        **options: 백엔드별 옵션 (예: ivf의 n_lists, n_probe, sharded의 n_shards)
+
+    Returns:
+        백엔드 객체 (kneighbors(Q, k) 메서드 제공)
+    """
+    if name == 'sharded':
+        # sharded_search가 이 모듈을 사용하므로 필요할 때 import
+        from sharded_search import ShardedBackend
+        return ShardedBackend(X, metric=metric, **options)
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 검색 백엔드: {name} (사용 가능: {', '.join(BACKENDS)}, sharded, auto)")
+    return BACKENDS[name](X, metric=metric, **options)
+
+
+def recall_at_k(approx_distances, exact_distances, tolerance=1e-5):
+    """
+    근사 검색 결과의 recall@k를 계산합니다.
+    거리가 같은 와인이 여러 개일 수 있으므로, 근사 결과 중 정확한 k번째 이웃의 거리 이내에 있는
+    결과의 비율로 계산합니다.
+
+    Args:
+        approx_distances: 근사 검색 거리 (shape: (n_queries, k))
+        exact_distances: 정확한 검색 거리 (shape: (n_queries, k))
+        tolerance: 거리 비교 허용 오차
+
+    Returns:
+        float: 0~1 사이의 recall@k
+    """
+    kth = np.asarray(exact_distances)[:, -1:] + tolerance
+    return float(np.mean(np.asarray(approx_distances) <= kth))
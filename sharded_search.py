@@ -0,0 +1,126 @@
+"""
+샤딩 기반 병렬 검색 모듈
+정규화된 feature 행렬을 공유 메모리에 한 번 올리고 N개의 샤드로 나누어,
+샤드마다 전용 워커 프로세스가 검색한 뒤 상위 k개 결과를 합칩니다.
+"""
+
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from search_backends import BruteForceBackend
+
+
+# 워커 프로세스 전역 상태 (샤드 하나를 담당)
+_worker_state = {}
+
+
+def _init_shard_worker(shm_name, shape, dtype, start, end, metric):
+    """
+    워커 프로세스 초기화: 공유 메모리에 연결하고 담당 샤드 구간을 복사 없이 참조합니다.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_state.update({
+        'shm': shm,
+        'X': X[start:end],
+        'start': start,
+        'backend': BruteForceBackend(X[start:end], metric=metric),
+    })
+
+
+def _worker_ready():
+    """
+    워커 프로세스가 시작되어 초기화를 마쳤는지 확인합니다.
+    """
+    return True
+
+
+def _search_shard(Q, k):
+    """
+    담당 샤드에서 가장 가까운 k개를 찾아 전체 인덱스 기준으로 반환합니다.
+    샤드 안에서는 항상 brute force로 검색합니다. KD-tree는 k번째 경계의 동점을 brute force와 다르게 고르므로,
+    샤드가 이미 버린 와인은 합치는 단계에서 되살릴 수 없어 전체 검색과 결과가 달라질 수 있습니다.
+    """
+    X = _worker_state['X']
+    distances, indices = _worker_state['backend'].kneighbors(Q, min(k, len(X)))
+    return np.asarray(distances, dtype=np.float64), indices + _worker_state['start']
+
+
+def _release(executors, shm):
+    """
+    워커 프로세스를 종료하고 공유 메모리를 해제합니다.
+    """
+    for executor in executors:
+        executor.shutdown(wait=True, cancel_futures=True)
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ShardedBackend:
+    """
+    샤드별 전용 워커 프로세스에서 병렬로 검색하는 백엔드
+    각 워커는 공유 메모리의 자기 샤드 구간만 참조하므로 데이터는 복사되지 않으며,
+    샤드 안에서는 brute force로 검색하고 거리가 같으면 인덱스 순으로 고르므로, 결과가 한 번의 전체 검색과 같습니다.
+    """
+
+    name = 'sharded'
+
+    def __init__(self, X, metric='euclidean', n_shards=None):
+        """
+        Args:
+            X: 정규화된 학습 데이터
+            metric: 거리 계산 방법
+            n_shards: 샤드(워커 프로세스) 개수, None이면 CPU 개수
+        """
+        if metric != 'euclidean':
+            raise ValueError(f"sharded 백엔드는 euclidean 거리만 지원합니다: {metric}")
+
+        n_samples = X.shape[0]
+        if n_shards is None:
+            n_shards = os.cpu_count() or 1
+        n_shards = max(1, min(n_shards, n_samples))
+
+        X = np.ascontiguousarray(X)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        np.ndarray(X.shape, dtype=X.dtype, buffer=self.shm.buf)[:] = X
+
+        bounds = np.linspace(0, n_samples, n_shards + 1).astype(int)
+        # GPT 요청 스레드 등이 잡고 있던 잠금을 복사한 채 fork하면 워커가 멈출 수 있으므로 spawn으로 시작
+        mp_context = multiprocessing.get_context('spawn')
+        self.executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=mp_context,
+                initializer=_init_shard_worker,
+                initargs=(self.shm.name, X.shape, X.dtype.str, int(start), int(end), metric)
+            )
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        self._finalizer = weakref.finalize(self, _release, self.executors, self.shm)
+
+        # spawn 워커는 시작할 때 모듈을 새로 import하므로, 첫 검색이 아니라 백엔드를 만들 때 모두 시작
+        for future in [executor.submit(_worker_ready) for executor in self.executors]:
+            future.result()
+
+    def kneighbors(self, Q, k):
+        Q = np.asarray(Q, dtype=np.float32)
+        futures = [executor.submit(_search_shard, Q, k) for executor in self.executors]
+        results = [future.result() for future in futures]
+
+        # 샤드별 상위 k개를 합쳐 전체 상위 k개 선택 (거리가 같으면 인덱스 순)
+        distances = np.concatenate([result[0] for result in results], axis=1)
+        indices = np.concatenate([result[1] for result in results], axis=1)
+        order = np.lexsort((indices, distances), axis=1)[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+    def close(self):
+        """워커 프로세스를 종료하고 공유 메모리를 해제합니다."""
+        self._finalizer()
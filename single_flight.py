@@ -0,0 +1,139 @@
+"""
+동시 요청 합치기(single-flight) 모듈
+같은 키로 동시에 들어온 호출 중 하나만 실제로 실행하고, 나머지 호출은 그 결과(또는 오류)를
+함께 받도록 합니다. 스레드와 asyncio 태스크가 같은 진행 중인 호출을 공유할 수 있습니다.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    키별로 진행 중인 호출을 하나로 합치는 클래스
+    호출이 끝나면 키를 제거하므로, 결과를 저장해 두는 캐시가 아니라 동시에 진행 중인 호출만 합칩니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # 코루틴 호출을 실행 중인 태스크 (실행이 끝나기 전에 가비지 컬렉션되지 않도록 참조 보관)
+        self._tasks = set()
+
+    def _join(self, key):
+        """
+        키에 해당하는 진행 중인 호출을 찾거나 새로 등록합니다.
+
+        Returns:
+            tuple: (공유 Future, 이 호출이 실제로 실행해야 하는지 여부)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            # 실행 중 상태로 두어, 기다리던 asyncio 태스크 하나가 취소되어도 공유 Future는 취소되지 않게 함
+            future.set_running_or_notify_cancel()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        """
+        호출 결과를 공유 Future에 기록하고 키를 제거합니다.
+        """
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run(self, key, future, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        같은 키로 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 func를 실행합니다.
+
+        Args:
+            key: 합칠 호출을 구분하는 키 (hashable)
+            func: 실행할 함수
+            *args, **kwargs: func 인자
+
+        Returns:
+            func의 반환값 (다른 호출이 실행한 경우 그 반환값)
+
+        Raises:
+            func에서 발생한 오류 (다른 호출이 실행한 경우 그 오류)
+        """
+        future, is_leader = self._join(key)
+        if is_leader:
+            return self._run(key, future, func, args, kwargs)
+        return future.result()
+
+    async def do_async(self, key, func, *args, **kwargs):
+        """
+        do()의 asyncio 버전입니다. 기다리는 동안 이벤트 루프를 막지 않으며,
+        다른 스레드나 태스크에서 진행 중인 같은 키의 호출과 결과를 공유합니다.
+
+        Args:
+            key: 합칠 호출을 구분하는 키 (hashable)
+            func: 실행할 함수 (코루틴 함수이면 별도 태스크에서 실행,
+                일반 함수이면 이벤트 루프의 기본 executor 스레드에서 실행)
+                어느 경우든 호출한 태스크가 취소되어도 실제 호출은 계속 진행되어 다른 호출이 결과를 받습니다.
+            *args, **kwargs: func 인자
+
+        Returns:
+            func의 반환값 (다른 호출이 실행한 경우 그 반환값)
+        """
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+
+        if asyncio.iscoroutinefunction(func):
+            task = asyncio.ensure_future(self._run_coroutine(key, future, func, args, kwargs))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._run_quietly, key, future, func, args, kwargs)
+        return await asyncio.wrap_future(future)
+
+    async def _run_coroutine(self, key, future, func, args, kwargs):
+        """
+        별도 태스크에서 코루틴 호출을 실행합니다. 오류는 공유 Future로만 전달합니다.
+        이벤트 루프 종료 등으로 이 태스크가 취소되면, 다른 스레드에서 기다리는 호출이
+        CancelledError(BaseException)를 받지 않도록 RuntimeError로 바꾸어 전달합니다.
+        """
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._finish(key, future, error=RuntimeError("진행 중인 호출이 취소되었습니다."))
+        except BaseException as e:
+            self._finish(key, future, error=e)
+        else:
+            self._finish(key, future, result=result)
+
+    def _run_quietly(self, key, future, func, args, kwargs):
+        """
+        executor 스레드에서 실행하는 경우: 오류는 공유 Future로만 전달합니다.
+        """
+        try:
+            self._run(key, future, func, args, kwargs)
+        except BaseException:
+            pass
+
+    def in_flight(self):
+        """
+        진행 중인 호출 개수를 반환합니다.
+        """
+        with self._lock:
+            return len(self._calls)
@@ -2,11 +2,23 @@
 와인 추천 시스템 Streamlit 웹 UI
 """
 
+import os
 import streamlit as st
 from recommender import WineRecommender
 import time
 
 
+# 와인 데이터 파일 경로
+DATA_FILE = "cleansingWine.csv"
+
+# 여러 워커 프로세스가 공유하는 디렉터리 (WineRecommender.publish()로 미리 생성)
+# 지정하면 각 프로세스가 데이터를 직접 로드하지 않고 메모리 매핑으로 연결합니다.
+SHARED_DIR = os.environ.get("WINE_SHARED_DIR")
+
+# 데이터 파일 변경 확인 간격(초), 변경되면 백그라운드에서 다시 로드하여 교체
+WATCH_INTERVAL = 5.0
+
+
 # 페이지 설정
 st.set_page_config(
     page_title="Le Mariage",
@@ -17,16 +29,51 @@ st.set_page_config(
 # 세션 상태 초기화
 if 'recommender' not in st.session_state:
     st.session_state.recommender = None
-if 'initialized' not in st.session_state:
-    st.session_state.initialized = False
+if 'result' not in st.session_state:
+    st.session_state.result = None
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_shared_recommender(data_file, shared_version=None):
+    """
+    모든 세션이 공유하는 추천 시스템을 생성합니다.
+    lazy 모드로 생성하므로 바로 반환되고, 카탈로그 로드와 모델 학습은 백그라운드에서 진행됩니다.
+    프로세스당 한 번만 생성되며, 데이터 파일이 수정되면 인스턴스가 백그라운드에서
+    카탈로그를 다시 로드하여 교체하므로 진행 중인 요청이 끊기거나 기다리지 않습니다.
+    생성은 Streamlit이 키별로 직렬화하고, 추천 요청은 잠금 없이 현재 카탈로그 상태를 읽으므로
+    여러 스크립트 실행이 동시에 사용해도 안전합니다.
+    SHARED_DIR이 지정된 경우에는 공유 디렉터리의 shared_version 버전에 읽기 전용으로 연결하며,
+    다시 publish()되어 버전이 바뀌면 새로 연결합니다.
+    """
+    if SHARED_DIR:
+        return WineRecommender.attach(SHARED_DIR, version=shared_version)
+    return WineRecommender(data_file=data_file, watch_interval=WATCH_INTERVAL, lazy=True)
 
 
 def initialize_recommender():
-    """추천 시스템 초기화"""
-    if not st.session_state.initialized:
-        with st.spinner("데이터를 로드하고 모델을 학습하는 중..."):
-            st.session_state.recommender = WineRecommender()
-            st.session_state.initialized = True
+    """추천 시스템 초기화 (프로세스 공유 인스턴스 사용)"""
+    shared_version = None
+    try:
+        if SHARED_DIR:
+            # publish()는 새 버전 디렉터리를 모두 쓴 뒤 마지막에 manifest를 교체하므로 manifest의 버전으로 판단
+            shared_version = WineRecommender.shared_version(SHARED_DIR)
+            if shared_version is None:
+                raise ValueError(f"공유 디렉터리에 publish된 데이터가 없습니다: {SHARED_DIR}")
+        recommender = load_shared_recommender(DATA_FILE, shared_version)
+    except Exception as e:
+        # 새 버전에 연결하지 못하면 이 세션이 사용하던 인스턴스를 계속 사용
+        if st.session_state.recommender is None:
+            st.error(f"❌ 와인 데이터를 불러오지 못했습니다: {str(e)}")
+            st.stop()
+        print(f"⚠️  공유 와인 데이터 연결 실패, 이전 데이터 사용: {str(e)}")
+        return
+    
+    # 백그라운드 로드에 실패한 인스턴스는 다음 실행에서 다시 만들도록 캐시에서 제거
+    try:
+        recommender.wait(timeout=0)
+    except Exception:
+        load_shared_recommender.clear()
+    st.session_state.recommender = recommender
 
 
 def format_profile_bar(value, max_value, label):
@@ -383,9 +430,8 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     
-    # 추천 시스템 초기화
-    if not st.session_state.initialized:
-        initialize_recommender()
+    # 추천 시스템 초기화 (데이터 파일이 바뀌었으면 새 인스턴스로 교체)
+    initialize_recommender()
     
     # ========== Hero 섹션 ==========
     st.markdown(
@@ -427,64 +473,107 @@ def main():
             should_recommend = True
     
     if should_recommend and food_name:
-        # 로딩 UI 표시
-        with st.spinner(f"🔍 '{food_name}'에 어울리는 와인 프로파일을 생성하는 중..."):
+        # 로딩 UI 표시 (와인 데이터 준비는 프로파일 생성과 동시에 진행)
+        spinner_text = f"🔍 '{food_name}'에 어울리는 와인 프로파일을 생성하는 중..."
+        if not st.session_state.recommender.ready():
+            spinner_text = f"🔍 '{food_name}'에 어울리는 와인 프로파일을 생성하고 와인 데이터를 준비하는 중..."
+        with st.spinner(spinner_text):
             try:
-                # 와인 추천
-                recommendations, profile_info = st.session_state.recommender.recommend(food_name)
-                
-                # 결과 표시
-                st.success(f"✅ '{food_name}'에 어울리는 와인을 찾았습니다!")
-                
-                # 프로파일 정보 표시
-                st.header("📊 음식 프로파일")
-                profile = profile_info['profile']
-                source = profile_info['source']
-                description = profile_info.get('description', '')
-                
-                #source_text = "GPT API로 생성" if source == 'gpt' else "기본 프로파일 사용"
-                #st.info(f"**프로파일 소스**: {source_text}")
-                
-                # 프로파일 바 차트
-                st.markdown("**목표 와인 프로파일:**")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("**단맛 (Sweet)**")
-                    st.progress(profile[0] / 5)
-                    st.caption(f"Sweet: {profile[0]}/5")
-                    
-                    st.markdown("**산도 (Acidity)**")
-                    st.progress(profile[1] / 4)
-                    st.caption(f"Acidity: {profile[1]}/4")
-                
-                with col2:
-                    st.markdown("**바디감 (Body)**")
-                    st.progress(profile[2] / 5)
-                    st.caption(f"Body: {profile[2]}/5")
-                    
-                    st.markdown("**탄닌감 (Tannin)**")
-                    st.progress(profile[3] / 5)
-                    st.caption(f"Tannin: {profile[3]}/5")
-                
-                # 설명 표시
-                if description:
-                    st.markdown("**💬 프로파일 설명:**")
-                    st.info(description)
-                
-                # 추천 와인 표시
-                st.header("🍷 추천 와인")
-                st.markdown(f"총 {len(recommendations)}개의 와인이 추천되었습니다.")
-                
-                # 각 와인 표시
-                for i, wine in enumerate(recommendations, 1):
-                    display_wine_profile(wine, i)
-                
+                # 와인 추천 (첫 페이지, 프로파일이 도착하면 바로 검색하고 설명은 화면을 그린 뒤 이어서 받음)
+                recommendations, profile_info, cursor, description_stream = (
+                    st.session_state.recommender.recommend_page_stream(food_name)
+                )
+                st.session_state.result = {
+                    'food_name': food_name,
+                    'profile_info': profile_info,
+                    'recommendations': recommendations,
+                    'cursor': cursor,
+                    'description_stream': description_stream
+                }
             except ValueError as e:
+                st.session_state.result = None
                 st.error(f"❌ 오류: {str(e)}")
             except Exception as e:
+                st.session_state.result = None
                 st.error(f"❌ 예상치 못한 오류가 발생했습니다: {str(e)}")
     
+    # 마지막 추천 결과 표시 ("더 보기"로 다시 실행되어도 유지)
+    result = st.session_state.result
+    if result:
+        food_name = result['food_name']
+        profile_info = result['profile_info']
+        recommendations = result['recommendations']
+        
+        # 결과 표시
+        st.success(f"✅ '{food_name}'에 어울리는 와인을 찾았습니다!")
+        
+        # 프로파일 정보 표시
+        st.header("📊 음식 프로파일")
+        profile = profile_info['profile']
+        source = profile_info['source']
+        description = profile_info.get('description', '')
+        
+        #source_text = "GPT API로 생성" if source == 'gpt' else "기본 프로파일 사용"
+        #st.info(f"**프로파일 소스**: {source_text}")
+        
+        # 프로파일 바 차트
+        st.markdown("**목표 와인 프로파일:**")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**단맛 (Sweet)**")
+            st.progress(profile[0] / 5)
+            st.caption(f"Sweet: {profile[0]}/5")
+        
+            st.markdown("**산도 (Acidity)**")
+            st.progress(profile[1] / 4)
+            st.caption(f"Acidity: {profile[1]}/4")
+        
+        with col2:
+            st.markdown("**바디감 (Body)**")
+            st.progress(profile[2] / 5)
+            st.caption(f"Body: {profile[2]}/5")
+        
+            st.markdown("**탄닌감 (Tannin)**")
+            st.progress(profile[3] / 5)
+            st.caption(f"Tannin: {profile[3]}/5")
+        
+        # 설명 표시 (스트리밍 중이면 자리만 만들어 두고 와인 목록을 먼저 표시)
+        description_stream = result.pop('description_stream', None)
+        description_placeholder = None
+        if description_stream is not None:
+            st.markdown("**💬 프로파일 설명:**")
+            description_placeholder = st.empty()
+        elif description:
+            st.markdown("**💬 프로파일 설명:**")
+            st.info(description)
+        
+        # 추천 와인 표시
+        st.header("🍷 추천 와인")
+        st.markdown(f"총 {len(recommendations)}개의 와인이 추천되었습니다.")
+        
+        # 각 와인 표시
+        for i, wine in enumerate(recommendations, 1):
+            display_wine_profile(wine, i)
+        
+        # 설명을 받는 대로 표시 (profile_info['description']에 이어 붙여짐)
+        if description_stream is not None:
+            for _ in description_stream:
+                description_placeholder.info(profile_info['description'] + " ▌")
+            description_placeholder.info(profile_info['description'])
+        
+        # 다음 페이지 불러오기 (저장된 커서로 이어서 검색)
+        if result['cursor'] is not None:
+            if st.button("더 보기", use_container_width=True, key="load_more_btn"):
+                try:
+                    more, _, cursor = st.session_state.recommender.recommend_page(cursor=result['cursor'])
+                    result['recommendations'] = recommendations + more
+                    result['cursor'] = cursor
+                except Exception as e:
+                    st.error(f"❌ 예상치 못한 오류가 발생했습니다: {str(e)}")
+                else:
+                    st.rerun()
+    
     st.markdown('</div></div>', unsafe_allow_html=True)
     
     # ========== 설명 섹션 (금색 배경) ==========